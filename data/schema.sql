@@ -136,6 +136,54 @@ CREATE TABLE IF NOT EXISTS recommendations (
 CREATE UNIQUE INDEX IF NOT EXISTS idx_recommendations_unique
     ON recommendations(run_date, customer_id, offer_id);
 
+-- Read-side copy of recommendations with offer/product columns inlined,
+-- rebuilt per run_date by score_ranker so the API can serve without JOINs.
+CREATE TABLE IF NOT EXISTS recommendations_denorm (
+    customer_id INTEGER NOT NULL,
+    run_date DATE NOT NULL,
+    rank INTEGER NOT NULL,
+    offer_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    product_name TEXT NOT NULL,
+    subcategory TEXT,
+    category TEXT NOT NULL,
+    brand TEXT,
+    offer_type TEXT NOT NULL,
+    discount_value REAL NOT NULL,
+    expiry_date DATE NOT NULL,
+    tier1_price REAL NOT NULL,
+    campaign_type TEXT,
+    score REAL NOT NULL,
+    PRIMARY KEY (customer_id, run_date, rank)
+);
+
+-- Full-text index over customer names for /customers/search (prefix MATCH).
+-- External-content table: triggers mirror customers; init_db() runs a
+-- one-time 'rebuild' when it creates the index on an existing database.
+CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+    business_name,
+    content='customers',
+    content_rowid='customer_id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_insert AFTER INSERT ON customers BEGIN
+    INSERT INTO customers_fts(rowid, business_name)
+    VALUES (new.customer_id, new.business_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_delete AFTER DELETE ON customers BEGIN
+    INSERT INTO customers_fts(customers_fts, rowid, business_name)
+    VALUES ('delete', old.customer_id, old.business_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_update AFTER UPDATE OF business_name ON customers BEGIN
+    INSERT INTO customers_fts(customers_fts, rowid, business_name)
+    VALUES ('delete', old.customer_id, old.business_name);
+    INSERT INTO customers_fts(rowid, business_name)
+    VALUES (new.customer_id, new.business_name);
+END;
+
 -- =========================================================================
 -- Feature tables (rebuilt by the pipeline)
 -- =========================================================================
@@ -225,8 +273,11 @@ CREATE INDEX IF NOT EXISTS idx_orders_customer_date
 CREATE INDEX IF NOT EXISTS idx_orders_timestamp
     ON orders(order_timestamp);
 
-CREATE INDEX IF NOT EXISTS idx_order_items_order
-    ON order_items(order_id);
+-- Covers the order_id -> product_id join in candidate generation and features;
+-- supersedes the order_id-only idx_order_items_order.
+DROP INDEX IF EXISTS idx_order_items_order;
+CREATE INDEX IF NOT EXISTS idx_order_items_order_product
+    ON order_items(order_id, product_id);
 
 CREATE INDEX IF NOT EXISTS idx_order_items_product
     ON order_items(product_id);
@@ -249,6 +300,13 @@ CREATE INDEX IF NOT EXISTS idx_redemptions_timestamp
 CREATE INDEX IF NOT EXISTS idx_recommendations_lookup
     ON recommendations(run_date, customer_id);
 
+-- Serves "WHERE customer_id = ? AND run_date = ? ORDER BY rank" without a sort;
+-- offer_id and score ride along so the lookup never touches the table.
+-- Supersedes the non-covering idx_rec_cust_date_rank.
+DROP INDEX IF EXISTS idx_rec_cust_date_rank;
+CREATE INDEX IF NOT EXISTS idx_rec_cust_run_rank
+    ON recommendations(customer_id, run_date, rank, offer_id, score);
+
 CREATE INDEX IF NOT EXISTS idx_offers_dates
     ON offers(start_date, end_date);
 
@@ -272,3 +330,9 @@ CREATE INDEX IF NOT EXISTS idx_orders_purchase_mode
 
 CREATE INDEX IF NOT EXISTS idx_candidate_pool_date
     ON candidate_pool(run_date, customer_id);
+
+CREATE INDEX IF NOT EXISTS idx_drift_run
+    ON drift_log(run_date, psi_value DESC);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_step
+    ON pipeline_runs(step, status, run_date DESC);
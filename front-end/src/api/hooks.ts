@@ -10,6 +10,8 @@ import type {
   DriftReport,
   DbStats,
   PipelineSimulateResponse,
+  PipelineJob,
+  PipelineJobSubmitted,
   BehaviorSummary,
   MetricsData,
   MetricsHistoryEntry,
@@ -98,11 +100,32 @@ const INVALIDATE_ALL = (qc: ReturnType<typeof useQueryClient>) => {
   qc.invalidateQueries({ queryKey: ['behavior'] });
 };
 
+const JOB_POLL_MS = 1000;
+
+/** Poll a queued pipeline job until it finishes; rejects if it failed. */
+async function waitForJob(jobId: string): Promise<PipelineJob> {
+  for (;;) {
+    const job = await get<PipelineJob>(`/pipeline/jobs/${jobId}`);
+    if (job.status === 'completed') return job;
+    if (job.status === 'failed' || job.status === 'cancelled') {
+      throw new Error(job.error || `Pipeline job for ${job.run_date} ${job.status}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS));
+  }
+}
+
+/** Submit a single pipeline job and resolve once it has completed. */
+async function runPipelineJob(path: string): Promise<PipelineSimulateResponse> {
+  const { job_id } = await post<PipelineJobSubmitted>(path);
+  const job = await waitForJob(job_id!);
+  return { status: job.status, run_date: job.run_date, results: job.results ?? {} };
+}
+
 /** Simulate customer behavior ONLY (orders, impressions, redemptions). No ML. */
 export function useSimulateBehavior() {
   const qc = useQueryClient();
   return useMutation({
-    mutationFn: () => post<{ status: string; run_date: string; summary: BehaviorSummary }>('/pipeline/simulate-behavior'),
+    mutationFn: () => runPipelineJob('/pipeline/simulate-behavior'),
     onSuccess: () => INVALIDATE_ALL(qc),
   });
 }
@@ -111,7 +134,7 @@ export function useSimulateBehavior() {
 export function useRunMlPipeline() {
   const qc = useQueryClient();
   return useMutation({
-    mutationFn: () => post<PipelineSimulateResponse>('/pipeline/run-ml'),
+    mutationFn: () => runPipelineJob('/pipeline/run-ml'),
     onSuccess: () => INVALIDATE_ALL(qc),
   });
 }
@@ -120,7 +143,7 @@ export function useRunMlPipeline() {
 export function useSimulateDay() {
   const qc = useQueryClient();
   return useMutation({
-    mutationFn: () => post<PipelineSimulateResponse>('/pipeline/simulate-day'),
+    mutationFn: () => runPipelineJob('/pipeline/simulate-day'),
     onSuccess: () => INVALIDATE_ALL(qc),
   });
 }
@@ -128,7 +151,15 @@ export function useSimulateDay() {
 export function useSimulateWeek() {
   const qc = useQueryClient();
   return useMutation({
-    mutationFn: () => post<PipelineSimulateResponse>('/pipeline/simulate-week'),
+    mutationFn: async (): Promise<PipelineSimulateResponse> => {
+      const { job_ids, run_date } = await post<PipelineJobSubmitted>('/pipeline/simulate-week');
+      // Jobs run in order on the server; waiting in order also surfaces the first failure
+      for (const jobId of job_ids ?? []) {
+        await waitForJob(jobId);
+        qc.invalidateQueries({ queryKey: ['pipeline'] });
+      }
+      return { status: 'completed', run_date, results: {} };
+    },
     onSuccess: () => INVALIDATE_ALL(qc),
   });
 }
@@ -158,6 +158,21 @@ export interface PipelineSimulateResponse {
   results: Record<string, { status: string; duration: number }>;
 }
 
+export interface PipelineJobSubmitted {
+  status: 'queued';
+  run_date: string;
+  job_id?: string;
+  job_ids?: string[];
+}
+
+export interface PipelineJob {
+  job_id: string;
+  run_date: string;
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+  results?: Record<string, { status: string; duration: number }>;
+  error?: string;
+}
+
 export interface BehaviorSummary {
   run_date: string;
   orders_generated: number;
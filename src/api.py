@@ -8,30 +8,174 @@ Usage:
     uvicorn src.api:app --host 0.0.0.0 --port 8000
 """
 
+import asyncio
+import hashlib
 import json
+import multiprocessing
 import os
-import sys
+import random
 import sqlite3
+import sys
+import time
+import uuid
 import logging
-import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from datetime import date, datetime, timedelta
-from typing import List, Optional
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Optional
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI, HTTPException, Query, Depends
+import aiosqlite
+import orjson
+from aiosqlitepool import SQLiteConnectionPool
+from cachetools import TTLCache, cached
+from fastapi import FastAPI, HTTPException, Query, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-from src.config import DB_PATH, API_HOST, API_PORT
-from src.db import get_connection
+from src.config import (
+    DB_PATH, API_HOST, API_PORT, API_DB_POOL_SIZE, PIPELINE_DAYS_PARALLEL,
+    RETRAIN_DAY_OF_WEEK, MODELS_DIR, DRIFT_RETRAIN_MIN_FEATURES,
+)
+from src.db import get_connection, get_db_context, migrate_db
+# Pipeline modules (pulls in sklearn/lightgbm) are imported once here rather
+# than inside the POST handlers, so the cost is paid at startup, not per request
+from src.simulate_day_behavior import simulate_day as sim_behavior
+from src.features import build_customer_features, build_offer_features
+from src.candidates import generate_candidate_pool
+from src.train_ranker import train_ranker, load_model
+from src.score_ranker import score_candidates
+from src.drift import check_drift
+from src.evaluate import compute_offline_metrics
+from src.daily_run import run_pipeline, _run_step, _log_pipeline_run
+from src.api_sql import (
+    BATCH_BUCKETS, BATCH_PAD_ID, SQL_MAX_RUN_DATE, SQL_HEALTH_COUNTS, SQL_STATS,
+    SQL_GET_CUSTOMER_TYPE, SQL_GET_RECS, SQL_BATCH_CUSTOMERS, SQL_BATCH_RECS,
+    SAMPLE_PROBE_BUCKETS, SQL_SAMPLE_BOUNDS, SQL_SAMPLE_PROBE, SQL_SAMPLE_FROM, SQL_SAMPLE_BEFORE,
+    SQL_SEARCH_CUSTOMERS,
+    SQL_GET_CUSTOMER, SQL_GET_CUSTOMER_FEATURES, SQL_GET_PRODUCT,
+    SQL_LATEST_METRICS, SQL_METRICS_HISTORY, SQL_PIPELINE_RUNS,
+    SQL_LAST_BEHAVIOR_DATE, SQL_LATEST_BEHAVIOR, SQL_DRIFT_ENTRIES,
+)
 
 logger = logging.getLogger(__name__)
 
+# Pooled aiosqlite connections, created in lifespan() and shared by all requests
+pool: Optional[SQLiteConnectionPool] = None
+
+# Single worker so queued pipeline runs execute one date at a time, in order,
+# unless PIPELINE_DAYS_PARALLEL opts into one worker per simulated day
+_pipeline_executor: Optional[ProcessPoolExecutor] = None
+_PIPELINE_WORKERS = min(7, os.cpu_count() or 1) if PIPELINE_DAYS_PARALLEL else 1
+
+# job_id -> {"run_date": str, "future": Future, "finished_at": float (once done)}
+_pipeline_jobs: Dict[str, dict] = {}
+_PIPELINE_JOB_RETENTION = 3600  # seconds a finished job stays pollable
+
+# Server event loop, captured in lifespan() so worker callbacks can hand
+# state changes back to it instead of mutating shared caches off-thread
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _connection_factory():
+    """Open one pooled, read-only connection and apply read-tuned pragmas once."""
+    # No row_factory: rows are plain tuples; dict-returning endpoints use _fetch_dicts()
+    conn = await aiosqlite.connect(str(DB_PATH), cached_statements=256)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA foreign_keys=ON")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    await conn.execute("PRAGMA cache_size=-65536")  # 64MB cache
+    await conn.execute("PRAGMA temp_store=MEMORY")
+    await conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+    await conn.execute("PRAGMA query_only=ON")  # API reads only; the pipeline writes
+    await _prime_statements(conn)
+    return conn
+
+
+# Hot-path statements with parameters that match no rows. Running them once
+# per pooled connection leaves them prepared in its statement cache, so even
+# the first request served by a connection skips parsing and planning.
+_PRIMED_STATEMENTS = [
+    (SQL_GET_CUSTOMER_TYPE, (BATCH_PAD_ID,)),
+    (SQL_GET_RECS, (BATCH_PAD_ID, "")),
+    (SQL_GET_CUSTOMER, (BATCH_PAD_ID,)),
+    (SQL_GET_PRODUCT, (BATCH_PAD_ID,)),
+    *[(SQL_BATCH_CUSTOMERS[n], (BATCH_PAD_ID,) * n) for n in BATCH_BUCKETS],
+    *[(SQL_BATCH_RECS[n], ("",) + (BATCH_PAD_ID,) * n) for n in BATCH_BUCKETS],
+]
+
+
+async def _prime_statements(conn):
+    """Prepare the hot-path statements on a new connection; skipped if the schema is missing."""
+    try:
+        for sql, params in _PRIMED_STATEMENTS:
+            cur = await conn.execute(sql, params)
+            await cur.fetchall()
+    except sqlite3.OperationalError as e:
+        logger.warning("Statement priming skipped: %s", e)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (C-speed dumps of native dicts)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _json(content, response: Optional[Response] = None) -> ORJSONResponse:
+    """
+    Return content as an ORJSONResponse directly.
+
+    A returned Response bypasses FastAPI's jsonable_encoder walk over the
+    payload. Headers that dependencies (http_cache) set on the injected
+    `response` are copied over, since FastAPI only merges them into
+    responses it builds itself.
+    """
+    rendered = ORJSONResponse(content)
+    if response is not None:
+        rendered.raw_headers.extend(response.raw_headers)
+    return rendered
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the connection pool and pipeline worker on startup, drain both on shutdown."""
+    global pool, _pipeline_executor, _event_loop
+    _event_loop = asyncio.get_running_loop()
+    if DB_PATH.exists():
+        # Pooled connections are query_only; upgrade an older schema before they open
+        with get_db_context(DB_PATH) as conn:
+            migrate_db(conn)
+    pool = SQLiteConnectionPool(
+        connection_factory=_connection_factory, pool_size=API_DB_POOL_SIZE
+    )
+    # spawn, not fork: forking while pool threads hold SQLite/malloc locks can deadlock the child
+    _pipeline_executor = ProcessPoolExecutor(
+        max_workers=_PIPELINE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        yield
+    finally:
+        _pipeline_executor.shutdown(wait=False, cancel_futures=True)
+        _pipeline_executor = None
+        _event_loop = None
+        await pool.close()
+        pool = None
+
+
 app = FastAPI(
     title="Metro Romania Offers Recommender API",
     description="Serve personalized offer recommendations for Metro Romania B2B customers.",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS — allow React dev server
@@ -42,6 +186,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress list-heavy JSON (batch, pipeline runs, metrics history) once it is
+# big enough for the saving to outweigh the CPU; small lookups go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 # ---------------------------------------------------------------------------
 # Pydantic models
@@ -72,6 +220,11 @@ class RecommendationResponse(BaseModel):
     generated_at: str
 
 
+class BatchRecommendationRequest(BaseModel):
+    customer_ids: List[int] = Field(..., min_length=1, max_length=100)
+    run_date: Optional[str] = None
+
+
 class HealthResponse(BaseModel):
     status: str
     db_size_mb: float
@@ -89,16 +242,155 @@ class MetricsResponse(BaseModel):
 # Dependencies
 # ---------------------------------------------------------------------------
 
-def get_db():
-    """Dependency that provides a database connection (thread-safe for FastAPI)."""
-    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
-    try:
+async def get_db():
+    """Dependency that lends a pooled aiosqlite connection for one request."""
+    async with pool.connection() as conn:
         yield conn
-    finally:
-        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+# Short-lived cache for aggregate reads (MAX(run_date), table counts).
+# Cleared by the pipeline endpoints once they have written new data.
+_stats_cache = TTLCache(maxsize=16, ttl=60)
+
+
+async def _cached(key, loader):
+    """Return _stats_cache[key], awaiting loader() on a miss."""
+    value = _stats_cache.get(key)
+    if value is None:
+        value = await loader()
+        _stats_cache[key] = value
+    return value
+
+
+# business_type (None = all) -> (MIN(customer_id), MAX(customer_id), COUNT(*)).
+# Customers are only written by generate_data, so a longer TTL is safe.
+_sample_bounds_cache = TTLCache(maxsize=8, ttl=300)
+
+
+@cached(TTLCache(maxsize=1, ttl=5))
+def _db_file_stat():
+    """
+    (size in MB, last write time) of the DB file, re-stat'ed at most every 5s.
+
+    The write time also covers the -wal file, where WAL-mode commits land
+    until the next checkpoint. Returns (0.0, 0.0) if the DB does not exist.
+    """
+    try:
+        st = DB_PATH.stat()
+    except FileNotFoundError:
+        return 0.0, 0.0
+    try:
+        mtime = max(st.st_mtime, Path(f"{DB_PATH}-wal").stat().st_mtime)
+    except FileNotFoundError:
+        mtime = st.st_mtime
+    return round(st.st_size / (1024 * 1024), 1), mtime
+
+
+def _db_write_version():
+    """
+    (mtime_ns, size) of the DB and its -wal file, stat'ed on every call.
+
+    Unlike _db_file_stat() this is never cached, so a commit from any
+    process (including a CLI pipeline run) changes it immediately; the
+    sizes tell apart commits that land within one mtime tick.
+    """
+    version = []
+    for path in (DB_PATH, Path(f"{DB_PATH}-wal")):
+        try:
+            st = path.stat()
+            version += [st.st_mtime_ns, st.st_size]
+        except FileNotFoundError:
+            version += [0, 0]
+    return tuple(version)
+
+
+CACHE_CONTROL = "private, max-age=60, stale-while-revalidate=300"
+
+
+def http_cache(request: Request, response: Response):
+    """
+    ETag / Cache-Control for GET endpoints whose data only changes with a DB write.
+
+    The tag hashes the request URL with the DB write time, so it is computed
+    without touching SQLite; a matching If-None-Match short-circuits to 304
+    before the endpoint (and its pooled connection) runs. The write time is
+    re-stat'ed per request, so a tag never outlives the data it describes.
+    """
+    digest = hashlib.blake2b(
+        f"{request.url.path}?{request.url.query}:{_db_write_version()}".encode(), digest_size=8
+    ).hexdigest()
+    tag = f'"{digest}"'
+    headers = {"ETag": tag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and tag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+async def _max_run_date(conn, table="recommendations_denorm"):
+    """Latest run_date in a run-keyed table, cached until the TTL or the next DB write."""
+    async def load():
+        cur = await conn.execute(SQL_MAX_RUN_DATE[table])
+        return (await cur.fetchone())[0]
+    return await _cached(("max_run_date", table, _db_file_stat()[1]), load)
+
+
+async def _fetch_dicts(cur):
+    """
+    Fetch all rows as plain dicts.
+
+    Rows come back as bare tuples and are zipped with the column names once,
+    so only endpoints that return dicts pay for the column-name mapping.
+    """
+    columns = [d[0] for d in cur.description]
+    return [dict(zip(columns, row)) for row in await cur.fetchall()]
+
+
+async def _fetch_dict(cur):
+    """Fetch one row as a plain dict, or None."""
+    row = await cur.fetchone()
+    if row is None:
+        return None
+    return dict(zip([d[0] for d in cur.description], row))
+
+
+@lru_cache(maxsize=1)
+def _iso_second(epoch_second: int) -> str:
+    return datetime.fromtimestamp(epoch_second).isoformat()
+
+
+def _generated_at() -> str:
+    """Response timestamp at 1-second resolution, formatted once per second."""
+    return _iso_second(int(time.time()))
+
+
+def _offer_recommendation(row):
+    """
+    Build an OfferRecommendation-shaped dict from a recommendations_denorm row.
+
+    Plain dicts skip Pydantic validation on the outbound path; keys follow
+    OfferRecommendation's field order so the JSON matches the documented model.
+    """
+    return {
+        "offer_id": row[0],
+        "product_id": row[3],
+        "product_name": row[4],
+        "subcategory": row[5],
+        "category": row[6],
+        "brand": row[7],
+        "offer_type": row[8],
+        "discount_value": row[9],
+        "tier1_price": row[11],
+        "campaign_type": row[12],
+        "score": round(row[1], 4),
+        "rank": row[2],
+        "expiry_date": row[10],
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -106,21 +398,21 @@ def get_db():
 # ---------------------------------------------------------------------------
 
 @app.get("/health", response_model=HealthResponse)
-def health_check(conn=Depends(get_db)):
+async def health_check(conn=Depends(get_db)):
     """Health check with database stats."""
     try:
-        total_customers = conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
-        total_recs = conn.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+        db_size, mtime = _db_file_stat()
 
-        last_run = conn.execute(
-            "SELECT MAX(run_date) FROM recommendations"
-        ).fetchone()[0]
+        async def load():
+            cur = await conn.execute(SQL_HEALTH_COUNTS)
+            return tuple(await cur.fetchone())
 
-        db_size = 0.0
-        if os.path.exists(str(DB_PATH)):
-            db_size = round(os.path.getsize(str(DB_PATH)) / (1024 * 1024), 1)
+        # Liveness probes hit this constantly; only re-count after a DB write
+        total_customers, total_recs = await _cached(("health", mtime), load)
+        last_run = await _max_run_date(conn)
 
-        return HealthResponse(
+        # Values come straight from typed SQL; skip field validation
+        return HealthResponse.model_construct(
             status="healthy",
             db_size_mb=db_size,
             last_run_date=last_run,
@@ -128,7 +420,7 @@ def health_check(conn=Depends(get_db)):
             total_recommendations=total_recs,
         )
     except Exception as e:
-        return HealthResponse(
+        return HealthResponse.model_construct(
             status=f"unhealthy: {e}",
             db_size_mb=0.0,
             total_customers=0,
@@ -136,8 +428,10 @@ def health_check(conn=Depends(get_db)):
         )
 
 
-@app.get("/recommendations", response_model=RecommendationResponse)
-def get_recommendations(
+@app.get("/recommendations", responses={200: {"model": RecommendationResponse}})
+async def get_recommendations(
+    response: Response,
+    _=Depends(http_cache),
     customer_id: int = Query(..., description="Customer ID"),
     run_date: Optional[str] = Query(None, description="Date (YYYY-MM-DD), default: latest"),
     conn=Depends(get_db),
@@ -148,18 +442,13 @@ def get_recommendations(
     Returns precomputed recommendations from the most recent daily run.
     """
     if run_date is None:
-        row = conn.execute(
-            "SELECT MAX(run_date) FROM recommendations"
-        ).fetchone()
-        if row is None or row[0] is None:
+        run_date = await _max_run_date(conn)
+        if run_date is None:
             raise HTTPException(status_code=404, detail="No recommendations available")
-        run_date = row[0]
 
     # Check customer exists
-    cust = conn.execute(
-        "SELECT business_type, business_subtype FROM customers WHERE customer_id = ?",
-        (customer_id,)
-    ).fetchone()
+    cur = await conn.execute(SQL_GET_CUSTOMER_TYPE, (customer_id,))
+    cust = await cur.fetchone()
     if cust is None:
         raise HTTPException(
             status_code=404, detail=f"Customer {customer_id} not found"
@@ -167,29 +456,9 @@ def get_recommendations(
     business_type = cust[0]
     business_subtype = cust[1]
 
-    # Fetch recommendations with offer/product details
-    rows = conn.execute("""
-        SELECT
-            r.offer_id,
-            r.score,
-            r.rank,
-            o.product_id,
-            p.name,
-            p.subcategory,
-            p.category,
-            p.brand,
-            o.offer_type,
-            o.discount_value,
-            o.end_date AS expiry_date,
-            p.tier1_price,
-            o.campaign_type
-        FROM recommendations r
-        JOIN offers o ON r.offer_id = o.offer_id
-        JOIN products p ON o.product_id = p.product_id
-        WHERE r.customer_id = ?
-          AND r.run_date = ?
-        ORDER BY r.rank ASC
-    """, (customer_id, run_date)).fetchall()
+    # Offer/product details are precomputed into recommendations_denorm
+    cur = await conn.execute(SQL_GET_RECS, (customer_id, run_date))
+    rows = await cur.fetchall()
 
     if not rows:
         raise HTTPException(
@@ -197,66 +466,118 @@ def get_recommendations(
             detail=f"No recommendations for customer {customer_id} on {run_date}",
         )
 
-    recommendations = [
-        OfferRecommendation(
-            offer_id=row[0],
-            score=round(row[1], 4),
-            rank=row[2],
-            product_id=row[3],
-            product_name=row[4],
-            subcategory=row[5],
-            category=row[6],
-            brand=row[7],
-            offer_type=row[8],
-            discount_value=row[9],
-            expiry_date=row[10],
-            tier1_price=row[11],
-            campaign_type=row[12],
-        )
-        for row in rows
-    ]
-
-    return RecommendationResponse(
-        customer_id=customer_id,
-        business_type=business_type,
-        business_subtype=business_subtype,
-        run_date=run_date,
-        recommendations=recommendations,
-        generated_at=datetime.now().isoformat(),
-    )
+    return _json({
+        "customer_id": customer_id,
+        "business_type": business_type,
+        "business_subtype": business_subtype,
+        "run_date": run_date,
+        "recommendations": [_offer_recommendation(row) for row in rows],
+        "generated_at": _generated_at(),
+    }, response)
 
 
 @app.get("/recommendations/batch")
-def get_batch_recommendations(
-    customer_ids: str = Query(..., description="Comma-separated customer IDs"),
+async def get_batch_recommendations(
+    request: Request,
+    customer_ids: List[int] = Query(
+        ..., min_length=1, max_length=100,
+        description="Customer IDs, repeated: ?customer_ids=1&customer_ids=2",
+    ),
     run_date: Optional[str] = Query(None),
     conn=Depends(get_db),
 ):
-    """Get recommendations for multiple customers."""
-    ids = [int(x.strip()) for x in customer_ids.split(",") if x.strip()]
+    """
+    Get recommendations for multiple customers.
+
+    Send Accept: application/x-ndjson to stream one JSON line per requested
+    customer instead of a single buffered document.
+    """
+    return await _batch_recommendations(request, conn, customer_ids, run_date)
+
+
+@app.post("/recommendations/batch")
+async def post_batch_recommendations(
+    request: Request,
+    body: BatchRecommendationRequest,
+    conn=Depends(get_db),
+):
+    """Get recommendations for multiple customers, ids in a JSON body."""
+    return await _batch_recommendations(request, conn, body.customer_ids, body.run_date)
+
+
+async def _batch_recommendations(request: Request, conn, ids: List[int], run_date: Optional[str]):
+    """Shared batch lookup; ids arrive already validated (1-100 ints)."""
+    if run_date is None:
+        run_date = await _max_run_date(conn)
+
+    customers, rows_by_customer = {}, {}
+    if run_date is not None:
+        customers, rows_by_customer = await _load_batch(conn, ids, run_date)
+
+    def result(cid, generated_at):
+        if cid not in customers or cid not in rows_by_customer:
+            return None
+        business_type, business_subtype = customers[cid]
+        return {
+            "customer_id": cid,
+            "business_type": business_type,
+            "business_subtype": business_subtype,
+            "run_date": run_date,
+            "recommendations": [_offer_recommendation(row) for row in rows_by_customer[cid]],
+            "generated_at": generated_at,
+        }
 
-    if not ids:
-        raise HTTPException(status_code=400, detail="No customer IDs provided")
-    if len(ids) > 100:
-        raise HTTPException(status_code=400, detail="Max 100 customers per batch")
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        async def lines():
+            generated_at = _generated_at()
+            for cid in ids:
+                item = result(cid, generated_at)
+                if item is None:
+                    item = {"customer_id": cid, "error": "not_found"}
+                yield orjson.dumps(item) + b"\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
 
     results = []
     errors = []
-
+    generated_at = _generated_at()
     for cid in ids:
-        try:
-            result = get_recommendations(customer_id=cid, run_date=run_date, conn=conn)
-            results.append(result.model_dump())
-        except HTTPException:
+        item = result(cid, generated_at)
+        if item is None:
             errors.append(cid)
+        else:
+            results.append(item)
 
-    return {
+    return _json({
         "results": results,
         "total_requested": len(ids),
         "total_returned": len(results),
         "missing_customer_ids": errors,
         "run_date": run_date,
+    })
+
+
+async def _load_batch(conn, ids: List[int], run_date: str):
+    """
+    Fetch a batch's customers and ranked rows in two queries.
+
+    Returns ({customer_id: (business_type, business_subtype)},
+    {customer_id: [recommendations_denorm rows in rank order]}).
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    # Pad to a fixed bucket size so the statement text (and its cache entry) repeats
+    bucket = next(n for n in BATCH_BUCKETS if n >= len(unique_ids))
+    padded_ids = unique_ids + [BATCH_PAD_ID] * (bucket - len(unique_ids))
+
+    cur = await conn.execute(SQL_BATCH_CUSTOMERS[bucket], padded_ids)
+    customers = {row[0]: (row[1], row[2]) for row in await cur.fetchall()}
+
+    # One query for the whole batch; rows arrive grouped by customer, ranked
+    cur = await conn.execute(SQL_BATCH_RECS[bucket], (run_date, *padded_ids))
+    rows_by_customer = {
+        cid: [row[1:] for row in group]
+        for cid, group in groupby(await cur.fetchall(), key=itemgetter(0))
     }
+    return customers, rows_by_customer
 
 
 # ---------------------------------------------------------------------------
@@ -264,97 +585,112 @@ def get_batch_recommendations(
 # ---------------------------------------------------------------------------
 
 @app.get("/customers/sample")
-def get_customer_sample(
+async def get_customer_sample(
     business_type: Optional[str] = Query(None),
-    limit: int = Query(20, le=100),
+    limit: int = Query(20, ge=1, le=100),
     conn=Depends(get_db),
 ):
-    """Get a random sample of customers for the selector dropdown."""
-    if business_type:
-        rows = conn.execute(
-            """SELECT customer_id, business_name, business_type, business_subtype,
-                      loyalty_tier, home_store_id
-               FROM customers
-               WHERE business_type = ?
-               ORDER BY RANDOM() LIMIT ?""",
-            (business_type, limit),
-        ).fetchall()
-    else:
-        rows = conn.execute(
-            """SELECT customer_id, business_name, business_type, business_subtype,
-                      loyalty_tier, home_store_id
-               FROM customers
-               ORDER BY RANDOM() LIMIT ?""",
-            (limit,),
-        ).fetchall()
+    """
+    Get a random sample of customers for the selector dropdown.
 
-    return [dict(r) for r in rows]
+    Draws up to 3x limit random customer_ids between the cached MIN/MAX
+    bounds and probes them through the primary key instead of ORDER BY
+    RANDOM() over the whole table. If id gaps or a rare business_type leave
+    the probe short, tops up with a primary-key window from a random start
+    id (wrapping to the lowest ids), which never sorts the table either.
+    """
+    bounds = _sample_bounds_cache.get(business_type)
+    if bounds is None:
+        cur = await conn.execute(SQL_SAMPLE_BOUNDS, (business_type, business_type))
+        bounds = _sample_bounds_cache[business_type] = tuple(await cur.fetchone())
+    min_id, max_id, n_customers = bounds
+
+    rows = []
+    if n_customers:
+        # Fixed-size probe, padded like the batch IN lists, so the statement text
+        # (and its cached plan) depends only on the bucket, never on the data
+        bucket = next(n for n in SAMPLE_PROBE_BUCKETS if n >= limit * 3)
+        probe_ids = random.sample(range(min_id, max_id + 1), min(bucket, max_id - min_id + 1))
+        probe_ids += [BATCH_PAD_ID] * (bucket - len(probe_ids))
+        cur = await conn.execute(
+            SQL_SAMPLE_PROBE[bucket], (*probe_ids, business_type, business_type)
+        )
+        rows = await _fetch_dicts(cur)
+
+    if len(rows) < min(limit, n_customers):
+        start_id = random.randint(min_id, max_id)
+        cur = await conn.execute(
+            SQL_SAMPLE_FROM, (start_id, business_type, business_type, limit)
+        )
+        window = await _fetch_dicts(cur)
+        if len(window) < limit:
+            cur = await conn.execute(
+                SQL_SAMPLE_BEFORE,
+                (start_id, business_type, business_type, limit - len(window)),
+            )
+            window += await _fetch_dicts(cur)
+        seen = {r["customer_id"] for r in rows}
+        rows += [r for r in window if r["customer_id"] not in seen]
+
+    return _json(random.sample(rows, min(limit, len(rows))))
 
 
 @app.get("/customers/search")
-def search_customers(
+async def search_customers(
     q: str = Query(..., min_length=2),
     limit: int = Query(20, le=100),
     conn=Depends(get_db),
 ):
-    """Search customers by business name."""
-    rows = conn.execute(
-        """SELECT customer_id, business_name, business_type, business_subtype,
-                  loyalty_tier, home_store_id
-           FROM customers
-           WHERE business_name LIKE ?
-           ORDER BY business_name
-           LIMIT ?""",
-        (f"%{q}%", limit),
-    ).fetchall()
+    """Search customers by business name (word-prefix match via customers_fts)."""
+    # Quote each word so FTS5 operators in user input are matched literally
+    terms = [t.replace('"', '""') for t in q.split()]
+    if not terms:
+        return []
+    match = " ".join(f'"{t}"*' for t in terms)
 
-    return [dict(r) for r in rows]
+    cur = await conn.execute(SQL_SEARCH_CUSTOMERS, (match, limit))
+    return _json(await _fetch_dicts(cur))
 
 
 @app.get("/customers/{customer_id}")
-def get_customer_profile(customer_id: int, conn=Depends(get_db)):
+async def get_customer_profile(
+    customer_id: int, _=Depends(http_cache), conn=Depends(get_db)
+):
     """Get customer profile and feature summary."""
-    cust = conn.execute(
-        "SELECT * FROM customers WHERE customer_id = ?", (customer_id,)
-    ).fetchone()
+    cur = await conn.execute(SQL_GET_CUSTOMER, (customer_id,))
+    profile = await _fetch_dict(cur)
 
-    if cust is None:
+    if profile is None:
         raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
 
-    feats = conn.execute(
-        "SELECT * FROM customer_features WHERE customer_id = ?", (customer_id,)
-    ).fetchone()
+    cur = await conn.execute(SQL_GET_CUSTOMER_FEATURES, (customer_id,))
+    feats = await _fetch_dict(cur)
 
-    profile = dict(cust)
     if feats:
-        profile["features"] = dict(feats)
+        profile["features"] = feats
 
     return profile
 
 
 @app.get("/products/{product_id}")
-def get_product_detail(product_id: int, conn=Depends(get_db)):
+async def get_product_detail(
+    product_id: int, _=Depends(http_cache), conn=Depends(get_db)
+):
     """Get product details with tier pricing."""
-    row = conn.execute(
-        "SELECT * FROM products WHERE product_id = ?", (product_id,)
-    ).fetchone()
+    cur = await conn.execute(SQL_GET_PRODUCT, (product_id,))
+    product = await _fetch_dict(cur)
 
-    if row is None:
+    if product is None:
         raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
 
-    return dict(row)
+    return product
 
 
 @app.get("/metrics")
-def get_latest_metrics(conn=Depends(get_db)):
+async def get_latest_metrics(_=Depends(http_cache), conn=Depends(get_db)):
     """Get metrics from the latest pipeline run — returns parsed dict, not string."""
-    row = conn.execute("""
-        SELECT run_date, metadata
-        FROM pipeline_runs
-        WHERE step = 'evaluate' AND status = 'completed'
-        ORDER BY run_date DESC
-        LIMIT 1
-    """).fetchone()
+    cur = await conn.execute(SQL_LATEST_METRICS)
+    row = await cur.fetchone()
 
     if row is None:
         raise HTTPException(status_code=404, detail="No evaluation metrics available")
@@ -364,164 +700,86 @@ def get_latest_metrics(conn=Depends(get_db)):
 
 
 @app.get("/metrics/history")
-def get_metrics_history(days: int = Query(30, le=90), conn=Depends(get_db)):
+async def get_metrics_history(days: int = Query(30, le=90), conn=Depends(get_db)):
     """Get evaluation metrics history for the last N days — one row per day."""
-    rows = conn.execute("""
-        SELECT run_date, metadata
-        FROM pipeline_runs
-        WHERE step = 'evaluate' AND status = 'completed'
-        ORDER BY run_date ASC
-        LIMIT ?
-    """, (days,)).fetchall()
+    cur = await conn.execute(SQL_METRICS_HISTORY, (days,))
+    rows = await cur.fetchall()
 
+    # Rows come newest-first so LIMIT keeps the latest days; chart wants oldest-first
     result = []
-    for row in rows:
+    for row in reversed(rows):
         metrics = json.loads(row[1]) if row[1] else {}
         result.append({"run_date": row[0], **metrics})
-    return result
+    return _json(result)
 
 
 @app.get("/stats")
-def get_db_stats(conn=Depends(get_db)):
+async def get_db_stats(
+    response: Response, _=Depends(http_cache), conn=Depends(get_db)
+):
     """Database summary statistics."""
-    def count(table: str) -> int:
-        return conn.execute(f"SELECT COUNT(*) FROM [{table}]").fetchone()[0]
-
-    last_run = conn.execute("SELECT MAX(run_date) FROM recommendations").fetchone()[0]
-
-    db_size = 0.0
-    if os.path.exists(str(DB_PATH)):
-        db_size = round(os.path.getsize(str(DB_PATH)) / (1024 * 1024), 1)
+    db_size, mtime = _db_file_stat()
+
+    async def load():
+        cur = await conn.execute(SQL_STATS)
+        (n_customers, n_products, n_offers, n_orders, n_recs,
+         last_run_date) = await cur.fetchone()
+        return {
+            "total_customers": n_customers,
+            "total_products": n_products,
+            "total_offers": n_offers,
+            "total_orders": n_orders,
+            "total_recommendations": n_recs,
+            "db_size_mb": db_size,
+            "last_run_date": last_run_date,
+        }
 
-    return {
-        "total_customers": count("customers"),
-        "total_products": count("products"),
-        "total_offers": count("offers"),
-        "total_orders": count("orders"),
-        "total_recommendations": count("recommendations"),
-        "db_size_mb": db_size,
-        "last_run_date": last_run,
-    }
+    # Keyed on the DB write time so new pipeline data busts the entry early
+    return _json(await _cached(("stats", mtime), load), response)
 
 
 @app.get("/pipeline/runs")
-def get_pipeline_runs(
+async def get_pipeline_runs(
     limit: int = Query(10, le=100),
     conn=Depends(get_db),
 ):
     """Recent pipeline run log."""
-    rows = conn.execute(
-        """SELECT run_id, run_date, step, status, duration_seconds, metadata, created_at
-           FROM pipeline_runs
-           WHERE status != 'started'
-           ORDER BY run_id DESC
-           LIMIT ?""",
-        (limit,),
-    ).fetchall()
-
-    return [dict(r) for r in rows]
+    cur = await conn.execute(SQL_PIPELINE_RUNS, (limit,))
+    return _json(await _fetch_dicts(cur))
 
 
-@app.post("/pipeline/simulate-behavior")
-def simulate_behavior_only(conn=Depends(get_db)):
+@app.post("/pipeline/simulate-behavior", status_code=202)
+async def simulate_behavior_only(conn=Depends(get_db)):
     """
-    Run ONLY the customer behavior simulation for the next date.
+    Queue ONLY the customer behavior simulation for the next date.
     Generates orders, impressions, redemptions — no ML steps.
     Use this to accumulate customer activity before running the ML pipeline.
     """
-    row = conn.execute("SELECT MAX(run_date) FROM pipeline_runs").fetchone()
-    last_date_str = row[0] if row and row[0] else None
-    conn.close()
+    run_date = (await _next_pipeline_date(conn)).strftime("%Y-%m-%d")
+    job_id = _submit_pipeline_job(run_date, _run_behavior_job)
 
-    if last_date_str:
-        last_date = datetime.strptime(last_date_str, "%Y-%m-%d").date()
-        next_date = last_date + timedelta(days=1)
-    else:
-        next_date = date.today()
-
-    run_date = next_date.strftime("%Y-%m-%d")
+    return {"status": "queued", "run_date": run_date, "job_id": job_id}
 
-    from src.simulate_day_behavior import simulate_day as sim_behavior
-    from src.db import get_connection as _gc
-    from src.daily_run import _log_pipeline_run
-    import time
 
-    conn2 = _gc()
-    _log_pipeline_run(conn2, run_date, "behavior", "started")
-    t0 = time.time()
-    try:
-        summary = sim_behavior(conn2, run_date)
-        duration = time.time() - t0
-        _log_pipeline_run(conn2, run_date, "behavior", "completed", duration, json.dumps(summary))
-        conn2.close()
-        return {"status": "completed", "run_date": run_date, "summary": summary}
-    except Exception as e:
-        duration = time.time() - t0
-        _log_pipeline_run(conn2, run_date, "behavior", "failed", duration, str(e))
-        conn2.close()
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@app.post("/pipeline/run-ml")
-def run_ml_pipeline(conn=Depends(get_db)):
+@app.post("/pipeline/run-ml", status_code=202)
+async def run_ml_pipeline(conn=Depends(get_db)):
     """
-    Run ONLY the ML pipeline steps (features→model→candidates→scoring→drift→eval).
+    Queue ONLY the ML pipeline steps (features→model→candidates→scoring→drift→eval).
     Assumes customer behavior has already been simulated for today.
     """
-    row = conn.execute("""
-        SELECT run_date FROM pipeline_runs
-        WHERE step = 'behavior' AND status = 'completed'
-        ORDER BY run_id DESC LIMIT 1
-    """).fetchone()
-    conn.close()
+    cur = await conn.execute(SQL_LAST_BEHAVIOR_DATE)
+    row = await cur.fetchone()
 
     if row is None:
         raise HTTPException(status_code=400, detail="No behavior simulation found. Run simulate-behavior first.")
 
     run_date = row[0]
+    job_id = _submit_pipeline_job(run_date, _run_ml_job)
 
-    from src.db import get_connection as _gc
-    from src.features import build_customer_features, build_offer_features
-    from src.candidates import generate_candidate_pool
-    from src.train_ranker import train_ranker, load_model
-    from src.score_ranker import score_candidates
-    from src.drift import check_drift, should_retrain_from_drift
-    from src.evaluate import compute_offline_metrics
-    from src.daily_run import _run_step, _log_pipeline_run
-    from src.config import RETRAIN_DAY_OF_WEEK, MODELS_DIR
-    import time
-
-    conn2 = _gc()
-    results = {}
-
-    _run_step(conn2, run_date, "features",
-              lambda: (build_customer_features(conn2, run_date), build_offer_features(conn2, run_date)),
-              results)
-
-    model = _run_step(conn2, run_date, "model", lambda: _load_or_train(conn2, run_date), results)
-
-    if model is None:
-        conn2.close()
-        raise HTTPException(status_code=500, detail="Model training failed")
-
-    _run_step(conn2, run_date, "candidates", lambda: generate_candidate_pool(conn2, run_date), results)
-    _run_step(conn2, run_date, "scoring", lambda: score_candidates(model, run_date, conn2), results)
-    _run_step(conn2, run_date, "drift", lambda: check_drift(conn2, run_date), results)
-    _run_step(conn2, run_date, "evaluate", lambda: compute_offline_metrics(conn2, run_date), results)
-
-    conn2.close()
-    return {
-        "status": "completed",
-        "run_date": run_date,
-        "results": {k: {"status": v.get("status"), "duration": v.get("duration", 0)} for k, v in results.items()},
-    }
+    return {"status": "queued", "run_date": run_date, "job_id": job_id}
 
 
 def _load_or_train(conn, run_date):
-    from src.train_ranker import train_ranker, load_model
-    from src.config import RETRAIN_DAY_OF_WEEK, MODELS_DIR
-    from datetime import datetime
-    from pathlib import Path
     dt = datetime.strptime(run_date, "%Y-%m-%d")
     artifact_path = Path(MODELS_DIR) / "ranker_latest.pkl"
     if dt.weekday() == RETRAIN_DAY_OF_WEEK or not artifact_path.exists():
@@ -531,105 +789,200 @@ def _load_or_train(conn, run_date):
     return model
 
 
-@app.post("/pipeline/simulate-day")
-def simulate_day(conn=Depends(get_db)):
-    """Run the daily pipeline for the next date."""
-    # Get last run date
-    row = conn.execute("SELECT MAX(run_date) FROM pipeline_runs").fetchone()
-    last_date_str = row[0] if row and row[0] else None
-    conn.close()
+def _step_summaries(results: dict) -> dict:
+    """Keep only the picklable status/duration of each pipeline step."""
+    return {
+        k: {"status": v.get("status", "unknown"), "duration": v.get("duration", 0)}
+        for k, v in results.items()
+    }
 
-    if last_date_str:
-        last_date = datetime.strptime(last_date_str, "%Y-%m-%d").date()
-        next_date = last_date + timedelta(days=1)
-    else:
-        next_date = date.today()
 
-    run_date = next_date.strftime("%Y-%m-%d")
+def _run_pipeline_job(run_date: str) -> dict:
+    """Worker-process entry point: run the full daily pipeline for run_date."""
+    return _step_summaries(run_pipeline(run_date))
 
-    from src.daily_run import run_pipeline
-    results = run_pipeline(run_date)
 
-    return {
-        "status": "completed",
-        "run_date": run_date,
-        "results": {
-            k: {"status": v.get("status", "unknown"), "duration": v.get("duration", 0)}
-            for k, v in results.items()
-        },
-    }
+def _run_behavior_job(run_date: str) -> dict:
+    """Worker-process entry point: simulate customer behavior for run_date."""
+    conn = get_connection()
+    migrate_db(conn)
+    _log_pipeline_run(conn, run_date, "behavior", "started")
+    t0 = time.time()
+    try:
+        summary = sim_behavior(conn, run_date)
+        duration = time.time() - t0
+        _log_pipeline_run(conn, run_date, "behavior", "completed", duration, json.dumps(summary))
+        return {"behavior": {"status": "completed", "duration": duration}}
+    except Exception as e:
+        duration = time.time() - t0
+        _log_pipeline_run(conn, run_date, "behavior", "failed", duration, str(e))
+        raise
+    finally:
+        conn.close()
+
+
+def _run_ml_job(run_date: str) -> dict:
+    """Worker-process entry point: ML steps only, on already-simulated behavior."""
+    conn = get_connection()
+    migrate_db(conn)
+    results = {}
+    try:
+        _run_step(conn, run_date, "features",
+                  lambda: (build_customer_features(conn, run_date), build_offer_features(conn, run_date)),
+                  results)
+
+        model = _run_step(conn, run_date, "model", lambda: _load_or_train(conn, run_date), results)
+        if model is None:
+            raise RuntimeError("Model training failed")
+
+        _run_step(conn, run_date, "candidates", lambda: generate_candidate_pool(conn, run_date), results)
+        _run_step(conn, run_date, "scoring", lambda: score_candidates(model, run_date, conn), results)
+        _run_step(conn, run_date, "drift", lambda: check_drift(conn, run_date), results)
+        _run_step(conn, run_date, "evaluate", lambda: compute_offline_metrics(conn, run_date), results)
+    finally:
+        conn.close()
+    return _step_summaries(results)
 
 
-@app.post("/pipeline/simulate-week")
-def simulate_week(conn=Depends(get_db)):
-    """Run the daily pipeline for 7 consecutive days."""
-    row = conn.execute("SELECT MAX(run_date) FROM pipeline_runs").fetchone()
+async def _next_pipeline_date(conn) -> date:
+    """
+    Day after the latest logged or still-queued run.
+
+    Queued jobs are read after the last await, so a caller that submits
+    without awaiting in between cannot race another request to the same date.
+    """
+    cur = await conn.execute(SQL_MAX_RUN_DATE["pipeline_runs"])
+    row = await cur.fetchone()
     last_date_str = row[0] if row and row[0] else None
-    conn.close()
+
+    queued = [j["run_date"] for j in _pipeline_jobs.values() if not j["future"].done()]
+    if queued:
+        last_date_str = max([last_date_str or "", *queued])
 
     if last_date_str:
-        last_date = datetime.strptime(last_date_str, "%Y-%m-%d").date()
-    else:
-        last_date = date.today() - timedelta(days=1)
+        return datetime.strptime(last_date_str, "%Y-%m-%d").date() + timedelta(days=1)
+    return date.today()
 
-    from src.daily_run import run_pipeline
 
-    all_results = {}
-    for i in range(1, 8):
-        run_date = (last_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        results = run_pipeline(run_date)
-        all_results[run_date] = {
-            k: {"status": v.get("status", "unknown"), "duration": v.get("duration", 0)}
-            for k, v in results.items()
-        }
+def _submit_pipeline_job(run_date: str, job=_run_pipeline_job) -> str:
+    """
+    Queue job(run_date) on the worker process and return its job id.
 
-    final_date = (last_date + timedelta(days=7)).strftime("%Y-%m-%d")
-    return {
-        "status": "completed",
-        "run_date": final_date,
-        "results": all_results,
-    }
+    Called only from async endpoints, so _pipeline_jobs is only ever
+    touched on the event loop.
+    """
+    if _pipeline_executor is None:
+        raise HTTPException(status_code=503, detail="Pipeline worker not running")
+
+    job_id = uuid.uuid4().hex
+    future = _pipeline_executor.submit(job, run_date)
+    _pipeline_jobs[job_id] = {"run_date": run_date, "future": future}
+    future.add_done_callback(lambda _: _notify_job_done(job_id))
+    return job_id
+
+
+def _notify_job_done(job_id: str):
+    """
+    Future done-callback, fired on the executor's management thread.
+
+    TTLCache is not thread-safe, so the bookkeeping is handed to the event
+    loop. Skipped once the loop is gone (jobs cancelled at shutdown).
+    """
+    loop = _event_loop
+    if loop is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(_on_pipeline_job_done, job_id)
+
+
+def _on_pipeline_job_done(job_id: str):
+    """On the event loop: drop cached stats and stamp the job's finish time."""
+    _stats_cache.clear()
+    job = _pipeline_jobs.get(job_id)
+    if job is not None:
+        job["finished_at"] = time.monotonic()
+    _prune_pipeline_jobs()
+
+
+def _prune_pipeline_jobs():
+    """Forget jobs that finished more than _PIPELINE_JOB_RETENTION seconds ago."""
+    now = time.monotonic()
+    expired = [
+        job_id for job_id, job in _pipeline_jobs.items()
+        if now - job.get("finished_at", now) > _PIPELINE_JOB_RETENTION
+    ]
+    for job_id in expired:
+        del _pipeline_jobs[job_id]
+
+
+@app.post("/pipeline/simulate-day", status_code=202)
+async def simulate_day(conn=Depends(get_db)):
+    """Queue the daily pipeline for the next date; poll /pipeline/jobs/{job_id}."""
+    run_date = (await _next_pipeline_date(conn)).strftime("%Y-%m-%d")
+    job_id = _submit_pipeline_job(run_date)
+
+    return {"status": "queued", "run_date": run_date, "job_id": job_id}
+
+
+@app.post("/pipeline/simulate-week", status_code=202)
+async def simulate_week(conn=Depends(get_db)):
+    """Queue the daily pipeline for 7 consecutive days, one job per date."""
+    first_date = await _next_pipeline_date(conn)
+
+    job_ids = []
+    for i in range(7):
+        run_date = (first_date + timedelta(days=i)).strftime("%Y-%m-%d")
+        job_ids.append(_submit_pipeline_job(run_date))
+
+    final_date = (first_date + timedelta(days=6)).strftime("%Y-%m-%d")
+    return {"status": "queued", "run_date": final_date, "job_ids": job_ids}
+
+
+@app.get("/pipeline/jobs/{job_id}")
+async def get_pipeline_job(job_id: str):
+    """Status of a queued pipeline run; results are included once it completes."""
+    _prune_pipeline_jobs()
+    job = _pipeline_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    future: Future = job["future"]
+    response = {"job_id": job_id, "run_date": job["run_date"]}
+    if future.cancelled():
+        response["status"] = "cancelled"
+    elif not future.done():
+        response["status"] = "running" if future.running() else "queued"
+    elif future.exception() is not None:
+        response["status"] = "failed"
+        response["error"] = str(future.exception())
+    else:
+        response["status"] = "completed"
+        response["results"] = future.result()
+    return response
 
 
 @app.get("/pipeline/behavior/latest")
-def get_behavior_summary(conn=Depends(get_db)):
+async def get_behavior_summary(conn=Depends(get_db)):
     """Latest behavior simulation summary."""
-    row = conn.execute("""
-        SELECT run_date, metadata FROM pipeline_runs
-        WHERE step = 'behavior' AND status = 'completed'
-        ORDER BY run_id DESC LIMIT 1
-    """).fetchone()
+    cur = await conn.execute(SQL_LATEST_BEHAVIOR)
+    row = await cur.fetchone()
     if row is None:
         raise HTTPException(status_code=404, detail="No behavior simulation available")
-    metadata = json.loads(row["metadata"]) if row["metadata"] else {}
-    return {"run_date": row["run_date"], **metadata}
+    metadata = json.loads(row[1]) if row[1] else {}
+    return {"run_date": row[0], **metadata}
 
 
 @app.get("/drift/latest")
-def get_drift_latest(conn=Depends(get_db)):
+async def get_drift_latest(_=Depends(http_cache), conn=Depends(get_db)):
     """Latest drift report."""
     # Get the most recent run_date with drift data
-    row = conn.execute(
-        "SELECT MAX(run_date) FROM drift_log"
-    ).fetchone()
+    run_date = await _max_run_date(conn, "drift_log")
 
-    if row is None or row[0] is None:
+    if run_date is None:
         return {"run_date": None, "entries": [], "retrain_recommended": False}
 
-    run_date = row[0]
-
-    rows = conn.execute(
-        """SELECT feature_name AS feature, psi_value AS psi, severity
-           FROM drift_log
-           WHERE run_date = ?
-           ORDER BY psi_value DESC""",
-        (run_date,),
-    ).fetchall()
-
-    entries = [dict(r) for r in rows]
+    cur = await conn.execute(SQL_DRIFT_ENTRIES, (run_date,))
+    entries = await _fetch_dicts(cur)
     n_alerts = sum(1 for e in entries if e["severity"] == "alert")
 
-    from src.config import DRIFT_RETRAIN_MIN_FEATURES
     return {
         "run_date": run_date,
         "entries": entries,
@@ -0,0 +1,179 @@
+"""
+SQL statements used by the Metro Recommender API.
+
+Every statement is built once at import time so each request passes the
+exact same string to SQLite and hits the connection's statement cache
+instead of re-parsing. Variable-length IN lists are bucketed to a fixed
+set of sizes for the same reason; callers pad ids with BATCH_PAD_ID.
+"""
+
+# Tables whose MAX(run_date) / COUNT(*) the API reads
+RUN_DATE_TABLES = ("recommendations", "recommendations_denorm", "drift_log", "pipeline_runs")
+COUNTED_TABLES = ("customers", "products", "offers", "orders", "recommendations")
+
+# IN-list sizes for /recommendations/batch; ids are padded up to the next bucket
+BATCH_BUCKETS = (1, 5, 10, 25, 50, 100)
+BATCH_PAD_ID = -1
+
+# Random-id probe sizes for /customers/sample: 3x oversampling of each batch
+# bucket, so a limit of up to 100 never binds more than 300 ids
+SAMPLE_PROBE_BUCKETS = tuple(3 * n for n in BATCH_BUCKETS)
+
+SQL_MAX_RUN_DATE = {
+    table: f"SELECT MAX(run_date) FROM [{table}]" for table in RUN_DATE_TABLES
+}
+
+# /health: customer and recommendation counts in one statement
+SQL_HEALTH_COUNTS = (
+    "SELECT (SELECT COUNT(*) FROM customers), (SELECT COUNT(*) FROM recommendations)"
+)
+
+# /stats in one statement: one column per COUNTED_TABLES entry, then the latest run
+SQL_STATS = "SELECT " + ", ".join(
+    [f"(SELECT COUNT(*) FROM [{table}])" for table in COUNTED_TABLES]
+    + ["(SELECT MAX(run_date) FROM recommendations)"]
+)
+
+
+# ---------------------------------------------------------------------------
+# Recommendations
+# ---------------------------------------------------------------------------
+
+SQL_GET_CUSTOMER_TYPE = (
+    "SELECT business_type, business_subtype FROM customers WHERE customer_id = ?"
+)
+
+_REC_COLUMNS = """
+            offer_id,
+            score,
+            rank,
+            product_id,
+            product_name,
+            subcategory,
+            category,
+            brand,
+            offer_type,
+            discount_value,
+            expiry_date,
+            tier1_price,
+            campaign_type"""
+
+SQL_GET_RECS = f"""
+        SELECT{_REC_COLUMNS}
+        FROM recommendations_denorm
+        WHERE customer_id = ?
+          AND run_date = ?
+        ORDER BY rank ASC
+    """
+
+
+def _in_list(n):
+    return ",".join("?" * n)
+
+
+SQL_BATCH_CUSTOMERS = {
+    n: f"""SELECT customer_id, business_type, business_subtype
+            FROM customers
+            WHERE customer_id IN ({_in_list(n)})"""
+    for n in BATCH_BUCKETS
+}
+
+SQL_BATCH_RECS = {
+    n: f"""
+        SELECT
+            customer_id,{_REC_COLUMNS}
+        FROM recommendations_denorm
+        WHERE run_date = ?
+          AND customer_id IN ({_in_list(n)})
+        ORDER BY customer_id, rank ASC
+    """
+    for n in BATCH_BUCKETS
+}
+
+
+# ---------------------------------------------------------------------------
+# Customers / products
+# ---------------------------------------------------------------------------
+
+_CUSTOMER_SUMMARY_COLUMNS = """customer_id, business_name, business_type, business_subtype,
+                       loyalty_tier, home_store_id"""
+
+SQL_SAMPLE_BOUNDS = """SELECT MIN(customer_id), MAX(customer_id), COUNT(*)
+               FROM customers
+               WHERE ? IS NULL OR business_type = ?"""
+
+# Contiguous primary-key window from a random start id, and its wrap-around
+SQL_SAMPLE_FROM = f"""SELECT {_CUSTOMER_SUMMARY_COLUMNS}
+               FROM customers
+               WHERE customer_id >= ? AND (? IS NULL OR business_type = ?)
+               ORDER BY customer_id LIMIT ?"""
+
+SQL_SAMPLE_BEFORE = f"""SELECT {_CUSTOMER_SUMMARY_COLUMNS}
+               FROM customers
+               WHERE customer_id < ? AND (? IS NULL OR business_type = ?)
+               ORDER BY customer_id LIMIT ?"""
+
+SQL_SEARCH_CUSTOMERS = """SELECT c.customer_id, c.business_name, c.business_type, c.business_subtype,
+                  c.loyalty_tier, c.home_store_id
+           FROM customers_fts f
+           JOIN customers c ON c.customer_id = f.rowid
+           WHERE customers_fts MATCH ?
+           ORDER BY f.rank
+           LIMIT ?"""
+
+SQL_GET_CUSTOMER = "SELECT * FROM customers WHERE customer_id = ?"
+SQL_GET_CUSTOMER_FEATURES = "SELECT * FROM customer_features WHERE customer_id = ?"
+SQL_GET_PRODUCT = "SELECT * FROM products WHERE product_id = ?"
+
+SQL_SAMPLE_PROBE = {
+    n: f"""SELECT {_CUSTOMER_SUMMARY_COLUMNS}
+                FROM customers
+                WHERE customer_id IN ({_in_list(n)})
+                  AND (? IS NULL OR business_type = ?)"""
+    for n in SAMPLE_PROBE_BUCKETS
+}
+
+
+# ---------------------------------------------------------------------------
+# Pipeline log / metrics / drift
+# ---------------------------------------------------------------------------
+
+SQL_LATEST_METRICS = """
+        SELECT run_date, metadata
+        FROM pipeline_runs
+        WHERE step = 'evaluate' AND status = 'completed'
+        ORDER BY run_date DESC
+        LIMIT 1
+    """
+
+# Newest N runs (walks idx_pipeline_step backwards); callers reverse to oldest-first
+SQL_METRICS_HISTORY = """
+        SELECT run_date, metadata
+        FROM pipeline_runs
+        WHERE step = 'evaluate' AND status = 'completed'
+        ORDER BY run_date DESC
+        LIMIT ?
+    """
+
+SQL_PIPELINE_RUNS = """SELECT run_id, run_date, step, status, duration_seconds, metadata, created_at
+           FROM pipeline_runs
+           WHERE status != 'started'
+           ORDER BY run_id DESC
+           LIMIT ?"""
+
+SQL_LAST_BEHAVIOR_DATE = """
+            SELECT run_date FROM pipeline_runs
+            WHERE step = 'behavior' AND status = 'completed'
+            ORDER BY run_id DESC LIMIT 1
+        """
+
+SQL_LATEST_BEHAVIOR = """
+        SELECT run_date, metadata FROM pipeline_runs
+        WHERE step = 'behavior' AND status = 'completed'
+        ORDER BY run_id DESC LIMIT 1
+    """
+
+SQL_DRIFT_ENTRIES = """SELECT feature_name AS feature, psi_value AS psi, severity
+           FROM drift_log
+           WHERE run_date = ?
+           ORDER BY psi_value DESC"""
@@ -17,9 +17,11 @@ import logging
 import os
 import sys
 from collections import defaultdict
+from itertools import islice
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import orjson
 import pandas as pd
 import numpy as np
 
@@ -30,6 +32,12 @@ from src.config import (
 
 logger = logging.getLogger(__name__)
 
+_INSERT_SQL = (
+    "INSERT OR IGNORE INTO candidate_pool (customer_id, offer_id, strategy, run_date) "
+    "VALUES (?,?,?,?)"
+)
+_INSERT_FLUSH_ROWS = 50_000
+
 
 def generate_candidate_pool(conn, run_date):
     """
@@ -37,8 +45,9 @@ def generate_candidate_pool(conn, run_date):
     """
     logger.info("Generating candidate pool...")
 
+    # The delete opens the write transaction; all inserts join it and are
+    # committed once at the end, so the pool is replaced atomically
     conn.execute("DELETE FROM candidate_pool WHERE run_date = ?", (run_date,))
-    conn.commit()
 
     # ---- Load reference data ----
 
@@ -47,7 +56,7 @@ def generate_candidate_pool(conn, run_date):
         SELECT o.offer_id, o.product_id, o.store_scope, o.business_type_scope,
                o.business_subtype_scope, o.loyalty_tier_scope,
                o.discount_value, o.offer_type,
-               p.category, p.margin, p.tier1_price, p.is_own_brand
+               p.category, p.is_own_brand
         FROM offers o
         JOIN products p ON o.product_id = p.product_id
         WHERE o.start_date <= :rd AND o.end_date >= :rd
@@ -55,56 +64,34 @@ def generate_candidate_pool(conn, run_date):
 
     if active_offers.empty:
         logger.warning("No active offers found for date %s", run_date)
+        conn.commit()
         return
 
     logger.info(f"  Active offers: {len(active_offers)}")
 
     # Pre-build lookup structures
+    # Plain column lists instead of iterrows(), which builds a Series per row
+    offer_ids = active_offers["offer_id"].tolist()
     cat_to_offers = defaultdict(list)
-    for _, row in active_offers.iterrows():
-        cat_to_offers[row["category"]].append(row["offer_id"])
-
-    # High-margin offers per category (so we can filter by customer's top categories)
-    active_offers["effective_margin"] = (
-        active_offers["tier1_price"] * active_offers["margin"]
-    )
-    # Pre-sort by margin within each category — used per-customer below
-    high_margin_by_cat = (
-        active_offers.sort_values("effective_margin", ascending=False)
-        .groupby("category")["offer_id"]
-        .apply(list)
-        .to_dict()
-    )
-
-    # Own brand offers (for own_brand_switch strategy)
-    own_brand_offers = active_offers[active_offers["is_own_brand"] == 1]["offer_id"].tolist()
+    for cat, oid in zip(active_offers["category"].tolist(), offer_ids):
+        cat_to_offers[cat].append(oid)
+
+    # High-margin offers per category (so we can filter by customer's top categories),
+    # ranked by effective margin in SQLite — used per-customer below
+    high_margin_by_cat = defaultdict(list)
+    for cat, oid in conn.execute("""
+        SELECT p.category, o.offer_id
+        FROM offers o
+        JOIN products p ON o.product_id = p.product_id
+        WHERE o.start_date <= :rd AND o.end_date >= :rd
+        ORDER BY p.category, p.tier1_price * p.margin DESC, o.offer_id
+    """, {"rd": run_date}):
+        high_margin_by_cat[cat].append(oid)
 
-    # Business subtype popularity: count impressions per offer per business_subtype
+    # Business subtype popularity: impression-ranked offers per business_subtype
     # Falls back to business_type if subtype has no data
-    bt_popularity = pd.read_sql("""
-        SELECT c.business_subtype, i.offer_id, COUNT(*) AS imp_count
-        FROM impressions i
-        JOIN customers c ON i.customer_id = c.customer_id
-        GROUP BY c.business_subtype, i.offer_id
-    """, conn)
-    bt_pop_map = defaultdict(list)
-    for _, row in bt_popularity.iterrows():
-        bt_pop_map[row["business_subtype"]].append((row["offer_id"], row["imp_count"]))
-    for bt in bt_pop_map:
-        bt_pop_map[bt].sort(key=lambda x: -x[1])
-
-    # Fallback: type-level popularity
-    bt_type_popularity = pd.read_sql("""
-        SELECT c.business_type, i.offer_id, COUNT(*) AS imp_count
-        FROM impressions i
-        JOIN customers c ON i.customer_id = c.customer_id
-        GROUP BY c.business_type, i.offer_id
-    """, conn)
-    bt_type_pop_map = defaultdict(list)
-    for _, row in bt_type_popularity.iterrows():
-        bt_type_pop_map[row["business_type"]].append((row["offer_id"], row["imp_count"]))
-    for bt in bt_type_pop_map:
-        bt_type_pop_map[bt].sort(key=lambda x: -x[1])
+    bt_pop_map = _popular_offers_by(conn, "business_subtype")
+    bt_type_pop_map = _popular_offers_by(conn, "business_type")
 
     # Customer data
     customers = pd.read_sql("""
@@ -114,88 +101,117 @@ def generate_candidate_pool(conn, run_date):
 
     # Customer top categories from customer_features
     cust_top_cats = {}
-    rows = conn.execute(
+    for cid, raw in conn.execute(
         "SELECT customer_id, top_3_categories FROM customer_features"
-    ).fetchall()
-    import json
-    for row in rows:
+    ):
         try:
-            cats = json.loads(row[1]) if row[1] else []
-        except (json.JSONDecodeError, TypeError):
+            cats = orjson.loads(raw) if raw else []
+        except (orjson.JSONDecodeError, TypeError):
             cats = []
-        cust_top_cats[row[0]] = cats
-
-    # Customer purchased products (last 90 days)
-    cust_products_raw = pd.read_sql("""
-        SELECT DISTINCT o.customer_id, oi.product_id
-        FROM orders o
-        JOIN order_items oi ON o.order_id = oi.order_id
-        WHERE DATE(o.order_timestamp) >= DATE(:rd, '-90 days')
-    """, conn, params={"rd": run_date})
-    cust_products = defaultdict(set)
-    for _, row in cust_products_raw.iterrows():
-        cust_products[row["customer_id"]].add(row["product_id"])
-
-    # Customer purchased categories (for cross-sell)
-    cust_purchased_cats = defaultdict(set)
-    cat_raw = pd.read_sql("""
-        SELECT DISTINCT o.customer_id, p.category
+        cust_top_cats[cid] = cats
+
+    # Customer purchased products (last 90 days), aggregated per customer in SQLite;
+    # purchased categories (for cross-sell) are derived from the same product sets
+    # rather than joining products onto every order item a second time
+    product_category = dict(conn.execute("SELECT product_id, category FROM products"))
+    cust_products = {}
+    cust_purchased_cats = {}
+    for cid, pids in conn.execute("""
+        SELECT o.customer_id, GROUP_CONCAT(DISTINCT oi.product_id)
         FROM orders o
         JOIN order_items oi ON o.order_id = oi.order_id
-        JOIN products p ON oi.product_id = p.product_id
-        WHERE DATE(o.order_timestamp) >= DATE(:rd, '-90 days')
-    """, conn, params={"rd": run_date})
-    for _, row in cat_raw.iterrows():
-        cust_purchased_cats[row["customer_id"]].add(row["category"])
+        WHERE o.order_timestamp >= DATE(:rd, '-90 days')
+        GROUP BY o.customer_id
+    """, {"rd": run_date}):
+        prods = cust_products[cid] = set(map(int, pids.split(",")))
+        cust_purchased_cats[cid] = {product_category[pid] for pid in prods}
 
     # Customer tier behavior (for tier_upgrade strategy)
-    cust_tier_info = pd.read_sql("""
-        SELECT customer_id, tier2_purchase_ratio, tier3_purchase_ratio
-        FROM customer_features
-    """, conn)
-    cust_tier_map = cust_tier_info.set_index("customer_id")
+    # Customers with low tier3 usage are good targets (NULL ratios never qualify)
+    tier_upgrade_targets = {
+        cid for (cid,) in conn.execute(
+            "SELECT customer_id FROM customer_features WHERE tier3_purchase_ratio < ?",
+            (0.3,),
+        )
+    }
 
     # Product-to-offer mapping
     product_to_offers = defaultdict(list)
-    for _, row in active_offers.iterrows():
-        product_to_offers[row["product_id"]].append(row["offer_id"])
-
-    # Active offer set
-    active_offer_set = set(active_offers["offer_id"].tolist())
-
-    # Offer eligibility indexes
-    offer_store_scope = {}
-    offer_bt_scope = {}
-    offer_sub_scope = {}
-    offer_lt_scope = {}
-    for _, row in active_offers.iterrows():
-        oid = row["offer_id"]
-        ss = row["store_scope"]
-        offer_store_scope[oid] = set(ss.split(",")) if pd.notna(ss) and ss else None
-        bts = row["business_type_scope"]
-        offer_bt_scope[oid] = set(bts.split(",")) if pd.notna(bts) and bts else None
-        subs = row["business_subtype_scope"]
-        offer_sub_scope[oid] = set(subs.split(",")) if pd.notna(subs) and subs else None
-        lts = row["loyalty_tier_scope"]
-        offer_lt_scope[oid] = set(lts.split(",")) if pd.notna(lts) and lts else None
+    for pid, oid in zip(active_offers["product_id"].tolist(), offer_ids):
+        product_to_offers[pid].append(oid)
 
     # All categories for cross-sell
     all_categories = list(cat_to_offers.keys())
 
+    # Dense offer index (row position in active_offers) for the vectorized
+    # eligibility matrix; cat_to_idx mirrors cat_to_offers in the same order
+    cat_to_idx = {
+        cat: np.array(idx, dtype=np.intp)
+        for cat, idx in active_offers.groupby("category", sort=False).indices.items()
+    }
+    all_cat_idx = np.concatenate(list(cat_to_idx.values()))
+    # Same index for the margin-ranked lists (Strategy 4) and own-brand offers (Strategy 7)
+    offer_pos = {oid: j for j, oid in enumerate(offer_ids)}
+    hm_cat_to_idx = {
+        cat: np.array([offer_pos[oid] for oid in oids], dtype=np.intp)
+        for cat, oids in high_margin_by_cat.items()
+    }
+    hm_all_idx = np.concatenate(list(hm_cat_to_idx.values()))
+    own_brand_idx = np.flatnonzero(active_offers["is_own_brand"].to_numpy() == 1)
+    # Offer eligibility: allowed-value set per offer and scope dimension
+    scope_sets = [
+        _scope_sets(active_offers[col])
+        for col in ("business_type_scope", "business_subtype_scope",
+                    "loyalty_tier_scope", "store_scope")
+    ]
+
+    # (business_type, subtype, store, loyalty_tier) -> (frozenset of eligible offer_ids,
+    # eligible Strategy 2 popularity list); customers sharing a scope profile share both
+    scope_profiles = {}
+
     # ---- Process customers in batches ----
     total_candidates = 0
     batch_size = 5000
+    insert_rows = []
+
+    # Customer columns as plain lists, converted once; store ids as strings to
+    # match the scope values
+    cust_ids = customers["customer_id"].tolist()
+    cust_bt = customers["business_type"].tolist()
+    cust_sub = customers["business_subtype"].tolist()
+    cust_store = customers["home_store_id"].astype(str).tolist()
+    cust_lt = customers["loyalty_tier"].tolist()
 
     for batch_start in range(0, len(customers), batch_size):
-        batch = customers.iloc[batch_start : batch_start + batch_size]
-        insert_rows = []
-
-        for _, cust in batch.iterrows():
-            cid = cust["customer_id"]
-            bt = cust["business_type"]
-            sub = cust["business_subtype"]
-            store = str(cust["home_store_id"])
-            ltier = cust["loyalty_tier"]
+        batch = slice(batch_start, batch_start + batch_size)
+
+        batch_ids = cust_ids[batch]
+        batch_bt = cust_bt[batch]
+        batch_sub = cust_sub[batch]
+        batch_store = cust_store[batch]
+        batch_lt = cust_lt[batch]
+        # eligible[i, j]: offer j passes every scope rule for batch customer i
+        eligible = _eligibility_matrix(
+            [batch_bt, batch_sub, batch_lt, batch_store], scope_sets
+        )
+
+        for i, (cid, bt, sub, store, ltier) in enumerate(
+            zip(batch_ids, batch_bt, batch_sub, batch_store, batch_lt)
+        ):
+            scope_key = (bt, sub, store, ltier)
+            profile = scope_profiles.get(scope_key)
+            if profile is None:
+                eligible_set = frozenset(
+                    offer_ids[j] for j in np.flatnonzero(eligible[i]).tolist()
+                )
+                # Subtype popularity, topped up from the type list when short
+                sub_offers = bt_pop_map.get(sub, [])
+                if len(sub_offers) < CANDIDATE_STRATEGY_LIMITS["business_type_popular"]:
+                    sub_offers = sub_offers + bt_type_pop_map.get(bt, [])
+                popular = [oid for oid in sub_offers if oid in eligible_set]
+                profile = scope_profiles[scope_key] = (eligible_set, popular)
+            eligible_set, popular = profile
+
             top_cats = cust_top_cats.get(cid, [])
             # Cold-start / inactive: seed top_cats from structural subtype knowledge
             if len(top_cats) < 2:
@@ -213,33 +229,22 @@ def generate_candidate_pool(conn, run_date):
             # Do NOT fall back to all categories — that is what causes SCO/freelancer
             # customers to receive food recommendations they have no affinity for.
             limit = CANDIDATE_STRATEGY_LIMITS["category_affinity"]
-            cat_candidates = []
-            for cat in top_cats:
-                cat_candidates.extend(cat_to_offers.get(cat, []))
-            for oid in cat_candidates[:limit]:
-                if oid not in candidates and _is_eligible(
-                    oid, bt, sub, store, ltier,
-                    offer_store_scope, offer_bt_scope, offer_sub_scope, offer_lt_scope
-                ):
-                    candidates[oid] = "category_affinity"
+            cat_idx = [cat_to_idx[cat] for cat in top_cats if cat in cat_to_idx]
+            if cat_idx:
+                idx = np.concatenate(cat_idx)[:limit]
+                for j in idx[eligible[i, idx]].tolist():
+                    candidates[offer_ids[j]] = "category_affinity"
 
             # --- Strategy 2: Business subtype popularity (falls back to type) ---
             limit = CANDIDATE_STRATEGY_LIMITS["business_type_popular"]
-            # Try subtype first for more specific recommendations
-            sub_offers = bt_pop_map.get(sub, [])
-            if len(sub_offers) < limit:
-                sub_offers = sub_offers + bt_type_pop_map.get(bt, [])
+            # Subtype first for more specific recommendations; eligible list per scope profile
             count = 0
-            for oid, _ in sub_offers:
-                if oid in active_offer_set and oid not in candidates:
-                    if _is_eligible(
-                        oid, bt, sub, store, ltier,
-                        offer_store_scope, offer_bt_scope, offer_sub_scope, offer_lt_scope
-                    ):
-                        candidates[oid] = "business_type_popular"
-                        count += 1
-                        if count >= limit:
-                            break
+            for oid in popular:
+                if oid not in candidates:
+                    candidates[oid] = "business_type_popular"
+                    count += 1
+                    if count >= limit:
+                        break
 
             # --- Strategy 3: Repeat purchase ---
             limit = CANDIDATE_STRATEGY_LIMITS["repeat_purchase"]
@@ -248,10 +253,7 @@ def generate_candidate_pool(conn, run_date):
                 if count >= limit:
                     break
                 for oid in product_to_offers.get(prod_id, []):
-                    if oid not in candidates and _is_eligible(
-                        oid, bt, sub, store, ltier,
-                        offer_store_scope, offer_bt_scope, offer_sub_scope, offer_lt_scope
-                    ):
+                    if oid not in candidates and oid in eligible_set:
                         candidates[oid] = "repeat_purchase"
                         count += 1
                         if count >= limit:
@@ -260,43 +262,40 @@ def generate_candidate_pool(conn, run_date):
             # --- Strategy 4: High margin within customer's top categories ---
             limit = CANDIDATE_STRATEGY_LIMITS["high_margin"]
             count = 0
-            # First pass: top categories the customer prefers
-            cats_for_margin = top_cats if top_cats else list(high_margin_by_cat.keys())
-            for cat in cats_for_margin:
-                for oid in high_margin_by_cat.get(cat, []):
-                    if count >= limit:
-                        break
-                    if oid not in candidates and _is_eligible(
-                        oid, bt, sub, store, ltier,
-                        offer_store_scope, offer_bt_scope, offer_sub_scope, offer_lt_scope
-                    ):
+            # Top categories the customer prefers, else every category
+            if top_cats:
+                hm_idx = [hm_cat_to_idx[cat] for cat in top_cats if cat in hm_cat_to_idx]
+            else:
+                hm_idx = [hm_all_idx]
+            if hm_idx:
+                idx = np.concatenate(hm_idx)
+                for j in idx[eligible[i, idx]].tolist():
+                    oid = offer_ids[j]
+                    if oid not in candidates:
                         candidates[oid] = "high_margin"
                         count += 1
-                if count >= limit:
-                    break
+                        if count >= limit:
+                            break
 
             # --- Strategy 5: Tier upgrade within customer's top categories ---
             # Offer products where customer typically buys at tier1/tier2
             # and could save by buying more
             limit = CANDIDATE_STRATEGY_LIMITS["tier_upgrade"]
-            if cid in cust_tier_map.index:
-                tier_info = cust_tier_map.loc[cid]
-                # Customers with low tier3 usage are good targets
-                if tier_info.get("tier3_purchase_ratio", 0) < 0.3:
-                    count = 0
-                    cats_for_tier = top_cats if top_cats else list(cat_to_offers.keys())
-                    for cat in cats_for_tier:
-                        for oid in cat_to_offers.get(cat, []):
+            if cid in tier_upgrade_targets:
+                count = 0
+                if top_cats:
+                    tier_idx = [cat_to_idx[cat] for cat in top_cats if cat in cat_to_idx]
+                else:
+                    tier_idx = [all_cat_idx]
+                if tier_idx:
+                    idx = np.concatenate(tier_idx)
+                    for j in idx[eligible[i, idx]].tolist():
+                        oid = offer_ids[j]
+                        if oid not in candidates:
+                            candidates[oid] = "tier_upgrade"
+                            count += 1
                             if count >= limit:
                                 break
-                            if oid not in candidates and _is_eligible(
-                                oid, bt, sub, store, ltier,
-                                offer_store_scope, offer_bt_scope, offer_sub_scope, offer_lt_scope
-                            ):
-                                candidates[oid] = "tier_upgrade"
-                                count += 1
-                        if count >= limit:
-                            break
 
             # --- Strategy 6: Cross-sell ---
             # Offer categories the customer hasn't purchased, gated to subtype-relevant ones
@@ -311,38 +310,36 @@ def generate_candidate_pool(conn, run_date):
                     for oid in cat_to_offers.get(cat, []):
                         if count >= limit:
                             break
-                        if oid not in candidates and _is_eligible(
-                            oid, bt, sub, store, ltier,
-                            offer_store_scope, offer_bt_scope, offer_sub_scope, offer_lt_scope
-                        ):
+                        if oid not in candidates and oid in eligible_set:
                             candidates[oid] = "cross_sell"
                             count += 1
 
             # --- Strategy 7: Own brand switch ---
             limit = CANDIDATE_STRATEGY_LIMITS["own_brand_switch"]
             count = 0
-            for oid in own_brand_offers:
-                if count >= limit:
-                    break
-                if oid not in candidates and _is_eligible(
-                    oid, bt, sub, store, ltier,
-                    offer_store_scope, offer_bt_scope, offer_sub_scope, offer_lt_scope
-                ):
+            for j in own_brand_idx[eligible[i, own_brand_idx]].tolist():
+                oid = offer_ids[j]
+                if oid not in candidates:
                     candidates[oid] = "own_brand_switch"
                     count += 1
+                    if count >= limit:
+                        break
 
             # Cap at CANDIDATE_POOL_SIZE
-            for oid, strategy in list(candidates.items())[:CANDIDATE_POOL_SIZE]:
-                insert_rows.append((cid, oid, strategy, run_date))
+            insert_rows.extend(
+                (cid, oid, strategy, run_date)
+                for oid, strategy in islice(candidates.items(), CANDIDATE_POOL_SIZE)
+            )
 
             total_candidates += min(len(candidates), CANDIDATE_POOL_SIZE)
 
-        # Batch insert
-        conn.executemany(
-            "INSERT OR IGNORE INTO candidate_pool (customer_id, offer_id, strategy, run_date) VALUES (?,?,?,?)",
-            insert_rows,
-        )
-        conn.commit()
+        # Flush in large chunks inside the one transaction
+        if len(insert_rows) >= _INSERT_FLUSH_ROWS:
+            conn.executemany(_INSERT_SQL, insert_rows)
+            insert_rows.clear()
+
+    conn.executemany(_INSERT_SQL, insert_rows)
+    conn.commit()
 
     logger.info(
         f"  Candidate pool: {total_candidates:,} total "
@@ -350,27 +347,49 @@ def generate_candidate_pool(conn, run_date):
     )
 
 
-def _is_eligible(offer_id, business_type, business_subtype, store_id, loyalty_tier,
-                 store_scope_map, bt_scope_map, sub_scope_map, lt_scope_map):
-    """Check if an offer is eligible for a customer based on scope rules."""
-    # Business type scope
-    bt_scope = bt_scope_map.get(offer_id)
-    if bt_scope is not None and business_type not in bt_scope:
-        return False
+def _scope_sets(scopes):
+    """Comma-separated scope column -> per-offer set of allowed values (None = any)."""
+    return [
+        set(scope.split(",")) if isinstance(scope, str) and scope else None
+        for scope in scopes.tolist()
+    ]
 
-    # Business subtype scope
-    sub_scope = sub_scope_map.get(offer_id)
-    if sub_scope is not None and business_subtype not in sub_scope:
-        return False
 
-    # Loyalty tier scope
-    lt_scope = lt_scope_map.get(offer_id)
-    if lt_scope is not None and loyalty_tier not in lt_scope:
-        return False
+def _popular_offers_by(conn, column):
+    """
+    customers.<column> value -> offer_ids ordered by impression count, most shown first.
+
+    Ranking and grouping happen in SQLite; ties keep offer_id order.
+    """
+    popular = defaultdict(list)
+    for key, oid in conn.execute(f"""
+        SELECT c.{column}, i.offer_id
+        FROM impressions i
+        JOIN customers c ON i.customer_id = c.customer_id
+        GROUP BY c.{column}, i.offer_id
+        ORDER BY c.{column}, COUNT(*) DESC, i.offer_id
+    """):
+        popular[key].append(oid)
+    return popular
 
-    # Store scope
-    st_scope = store_scope_map.get(offer_id)
-    if st_scope is not None and store_id not in st_scope:
-        return False
 
-    return True
+def _eligibility_matrix(customer_values, scope_sets):
+    """
+    Boolean [n_customers, n_offers] matrix of scope eligibility.
+
+    customer_values and scope_sets are parallel lists, one entry per scope
+    dimension (business type, subtype, loyalty tier, store): the batch's
+    values for that dimension and each offer's allowed set (None = any).
+    Each dimension is evaluated once per distinct customer value, then
+    broadcast to customers and AND-ed across dimensions.
+    """
+    n_offers = len(scope_sets[0])
+    eligible = np.ones((len(customer_values[0]), n_offers), dtype=bool)
+    for values, scopes in zip(customer_values, scope_sets):
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        allowed = np.array(
+            [[scope is None or value in scope for scope in scopes] for value in uniques],
+            dtype=bool,
+        ).reshape(len(uniques), n_offers)
+        eligible &= allowed[codes]
+    return eligible
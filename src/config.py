@@ -8,6 +8,8 @@ business (HoReCa, Trader, SCO, Freelancer). All prices in RON.
 
 from pathlib import Path
 
+import numpy as np
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
@@ -359,6 +361,12 @@ CATEGORIES = [
 
 CATEGORY_NAMES = [c[0] for c in CATEGORIES]
 CATEGORY_WEIGHTS = [c[1] for c in CATEGORIES]
+CATEGORY_INDEX = {name: i for i, name in enumerate(CATEGORY_NAMES)}
+
+# Array forms for rng.choice, built once so samplers skip the list coercion
+CATEGORY_NAMES_ARR = np.array(CATEGORY_NAMES, dtype=object)
+CATEGORY_WEIGHTS_ARR = np.array(CATEGORY_WEIGHTS, dtype=np.float64)
+CATEGORY_WEIGHTS_ARR /= CATEGORY_WEIGHTS_ARR.sum()
 
 # Fresh categories (perishable)
 FRESH_CATEGORIES = {
@@ -391,6 +399,9 @@ SUBCATEGORIES = {
     "electronics_small_appliances": ["small_electronics", "calculators", "pos_accessories", "lighting"],
 }
 
+# Object arrays of SUBCATEGORIES for rng.choice
+SUBCATEGORIES_ARR = {cat: np.array(subcats, dtype=object) for cat, subcats in SUBCATEGORIES.items()}
+
 # Base price ranges by category (RON, wholesale quantities)
 CATEGORY_PRICE_RANGE = {
     "meat_poultry": (15.0, 120.0),
@@ -567,6 +578,16 @@ METRO_OWN_BRANDS = {
     },
 }
 
+# Inverted: category -> eligible own brands (in METRO_OWN_BRANDS order)
+OWN_BRANDS_BY_CATEGORY = {}
+for _brand, _info in METRO_OWN_BRANDS.items():
+    for _cat in _info["categories"]:
+        OWN_BRANDS_BY_CATEGORY.setdefault(_cat, []).append(_brand)
+OWN_BRANDS_BY_CATEGORY = {
+    cat: np.array(brands, dtype=object) for cat, brands in OWN_BRANDS_BY_CATEGORY.items()
+}
+del _brand, _info, _cat
+
 OWN_BRAND_PROBABILITY = 0.30
 
 # ---------------------------------------------------------------------------
@@ -584,6 +605,9 @@ ROMANIAN_BRANDS = {
     "deli_charcuterie": ["Cris-Tim", "Angst", "Caroli", "Sergiana"],
 }
 
+# Object arrays of ROMANIAN_BRANDS for rng.choice
+ROMANIAN_BRANDS_ARR = {cat: np.array(brands, dtype=object) for cat, brands in ROMANIAN_BRANDS.items()}
+
 BRANDS_PER_CATEGORY = 8
 
 # ---------------------------------------------------------------------------
@@ -695,6 +719,26 @@ BUSINESS_CATEGORY_AFFINITY = {
     },
 }
 
+# Dense (subtype, category) form of the table above; missing pairs are neutral 1.0
+SUBTYPE_LIST = sorted({s for subs in BUSINESS_SUBTYPE_DIST.values() for s in subs})
+SUBTYPE_INDEX = {name: i for i, name in enumerate(SUBTYPE_LIST)}
+CATEGORY_AFFINITY_MATRIX = np.ones((len(SUBTYPE_LIST), len(CATEGORY_NAMES)), dtype=np.float64)
+for _sub, _aff in BUSINESS_CATEGORY_AFFINITY.items():
+    for _cat, _mult in _aff.items():
+        CATEGORY_AFFINITY_MATRIX[SUBTYPE_INDEX[_sub], CATEGORY_INDEX[_cat]] = _mult
+del _sub, _aff, _cat, _mult
+
+# BUSINESS_PROFILES as a structured array (one record per SUBTYPE_LIST entry)
+# so per-customer attributes can be gathered by subtype id in one step
+BUSINESS_PROFILE_ARR = np.zeros(
+    len(SUBTYPE_LIST),
+    dtype=[(attr, np.float64) for attr in BUSINESS_PROFILES[SUBTYPE_LIST[0]]],
+)
+for _sub, _profile in BUSINESS_PROFILES.items():
+    for _attr, _value in _profile.items():
+        BUSINESS_PROFILE_ARR[_attr][SUBTYPE_INDEX[_sub]] = _value
+del _sub, _profile, _attr, _value
+
 # ---------------------------------------------------------------------------
 # Seasonal multipliers (day_of_year -> multiplier)
 # ---------------------------------------------------------------------------
@@ -705,6 +749,14 @@ SEASONAL_EVENTS = {
     "new_year": {"start_day": 1, "end_day": 5, "multiplier": 1.5},
 }
 
+# Day-of-year (1..366) -> multiplier; the largest event wins where events overlap
+SEASONAL_MULTIPLIER_BY_DOY = [1.0] * 367
+for _event in SEASONAL_EVENTS.values():
+    for _doy in range(_event["start_day"], _event["end_day"] + 1):
+        SEASONAL_MULTIPLIER_BY_DOY[_doy] = max(SEASONAL_MULTIPLIER_BY_DOY[_doy], _event["multiplier"])
+SEASONAL_MULTIPLIER_BY_DOY = tuple(SEASONAL_MULTIPLIER_BY_DOY)
+del _event, _doy
+
 # Weekly purchase patterns (day_of_week -> multiplier)
 # HoReCa customers peak Mon/Thu (restocking), traders peak Tue/Wed
 WEEKLY_PATTERNS = {
@@ -745,6 +797,30 @@ CHANNEL_DIST = {
     "in_store": 0.10,
 }
 
+
+def _cumulative(dist):
+    """(labels, normalized cumulative weights) for inverse-CDF sampling.
+
+    Raises ValueError if the weights do not sum to 1, the check rng.choice
+    would otherwise have made on every draw.
+    """
+    labels = np.array(list(dist), dtype=object)
+    cum = np.cumsum(np.fromiter(dist.values(), dtype=np.float64, count=len(dist)))
+    if not np.isclose(cum[-1], 1.0):
+        raise ValueError(f"Weights for {list(dist)} sum to {cum[-1]:.6f}, expected 1.0")
+    cum /= cum[-1]
+    return labels, cum
+
+
+# Cumulative forms of the *_DIST tables, for src.generate_data.sample_categorical
+PURCHASE_MODE_CUM = _cumulative(PURCHASE_MODE_DIST)
+BUSINESS_TYPE_CUM = _cumulative(BUSINESS_TYPE_DIST)
+BUSINESS_SUBTYPE_CUM = {bt: _cumulative(d) for bt, d in BUSINESS_SUBTYPE_DIST.items()}
+LOYALTY_TIER_CUM = {bt: _cumulative(d) for bt, d in LOYALTY_TIERS.items()}
+OFFER_TYPE_CUM = _cumulative(OFFER_TYPE_DIST)
+CAMPAIGN_TYPE_CUM = _cumulative(CAMPAIGN_TYPE_DIST)
+CHANNEL_CUM = _cumulative(CHANNEL_DIST)
+
 # ---------------------------------------------------------------------------
 # Candidate generation
 # ---------------------------------------------------------------------------
@@ -841,6 +917,13 @@ BUSINESS_TYPE_ENCODING = {
     "freelancer": 3,
 }
 
+# WEEKLY_PATTERNS as a (business_type_encoded, day_of_week) matrix
+WEEKLY_PATTERN_MATRIX = np.ones((len(BUSINESS_TYPE_ENCODING), 7), dtype=np.float64)
+for _bt, _code in BUSINESS_TYPE_ENCODING.items():
+    for _dow, _mult in WEEKLY_PATTERNS[_bt].items():
+        WEEKLY_PATTERN_MATRIX[_code, _dow] = _mult
+del _bt, _code, _dow, _mult
+
 # LightGBM hyperparameters
 LGBM_PARAMS = {
     "n_estimators": 200,
@@ -877,6 +960,13 @@ DRIFT_FEATURES = [
 # ---------------------------------------------------------------------------
 API_HOST = "0.0.0.0"
 API_PORT = 8000
+API_DB_POOL_SIZE = 8  # long-lived read connections shared by all requests
+
+# Run simulate-week days concurrently on separate worker processes.
+# Off by default: day N+1's behavior simulation, features and weekly retrain
+# all read state written by day N, so parallel days are not equivalent to
+# serial ones. Only enable for throughput tests on a scratch DB.
+PIPELINE_DAYS_PARALLEL = False
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -24,7 +24,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.config import RETRAIN_DAY_OF_WEEK, MODELS_DIR
-from src.db import get_connection
+from src.db import get_connection, migrate_db
 from src.simulate_day_behavior import simulate_day
 from src.features import build_customer_features, build_offer_features
 from src.candidates import generate_candidate_pool
@@ -44,6 +44,7 @@ def run_pipeline(run_date: str):
         run_date: str, date in YYYY-MM-DD format
     """
     conn = get_connection()
+    migrate_db(conn)  # one-time schema upgrade for databases older than SCHEMA_VERSION
     pipeline_start = time.time()
 
     logger.info("=" * 60)
@@ -16,6 +16,7 @@ Usage:
 import json
 import os
 import sys
+import threading
 
 import numpy as np
 import pandas as pd
@@ -48,8 +49,22 @@ st.set_page_config(
 # ---------------------------------------------------------------------------
 
 @st.cache_resource
+def _db_connections():
+    return threading.local()
+
+
 def get_db():
-    return get_connection()
+    """Read-only connection owned by the calling thread.
+
+    Streamlit runs each session's script on its own thread and a sqlite3
+    connection can't be shared across threads, so every script thread opens
+    one (WAL, so sessions read concurrently) and reuses it across reruns.
+    """
+    local = _db_connections()
+    conn = getattr(local, "conn", None)
+    if conn is None:
+        conn = local.conn = get_connection(read_only=True)
+    return conn
 
 
 @st.cache_data(ttl=60)
@@ -60,6 +75,13 @@ def load_table(table_name, query=None):
     return pd.read_sql(f"SELECT * FROM {table_name}", conn)
 
 
+@st.cache_resource(max_entries=1)
+def load_artifact(path, mtime):
+    """Model artifact, loaded once per file version (mtime changes on retrain)."""
+    import joblib
+    return joblib.load(path, mmap_mode="r")
+
+
 def color_palette():
     return {
         "horeca": "#FF6B6B",
@@ -126,8 +148,19 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
 with tab1:
     st.header("Customer Insights")
 
-    customers = load_table("customers")
-    cust_feats = load_table("customer_features")
+    # Only the columns this tab plots; the full customer tables are wide
+    customers = load_table(
+        "customers",
+        "SELECT customer_id, business_type, business_subtype, loyalty_tier FROM customers",
+    )
+    cust_feats = load_table(
+        "customer_features",
+        """
+        SELECT customer_id, frequency, avg_basket_size, promo_affinity,
+               tier2_purchase_ratio, tier3_purchase_ratio
+        FROM customer_features
+        """,
+    )
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Customers", f"{len(customers):,}")
@@ -207,7 +240,10 @@ with tab1:
         cat_bt = load_table(
             "cat_bt",
             """
-            SELECT c.business_type, p.category, COUNT(*) AS purchase_count
+            SELECT c.business_type, p.category,
+                   CAST(COUNT(*) AS REAL)
+                       / SUM(COUNT(*)) OVER (PARTITION BY c.business_type) * 100
+                       AS purchase_pct
             FROM orders o
             JOIN order_items oi ON o.order_id = oi.order_id
             JOIN products p ON oi.product_id = p.product_id
@@ -215,10 +251,9 @@ with tab1:
             GROUP BY c.business_type, p.category
             """
         )
-        pivot = cat_bt.pivot_table(
-            index="category", columns="business_type", values="purchase_count", fill_value=0
-        )
-        pivot_pct = pivot.div(pivot.sum(axis=0), axis=1) * 100
+        pivot_pct = cat_bt.pivot(
+            index="category", columns="business_type", values="purchase_pct"
+        ).fillna(0)
 
         fig = px.imshow(
             pivot_pct,
@@ -278,7 +313,7 @@ with tab1:
 with tab2:
     st.header("Offer Analytics")
 
-    offers = load_table("offers")
+    offers = load_table("offers", "SELECT offer_id, offer_type FROM offers")
     offer_feats = load_table("offer_features")
 
     col1, col2, col3 = st.columns(3)
@@ -328,30 +363,30 @@ with tab2:
     # Impressions/redemptions over time
     st.subheader("Impressions & Redemptions Over Time")
     try:
-        daily_imp = load_table(
-            "daily_imp",
-            """
-            SELECT DATE(shown_timestamp) AS day, COUNT(*) AS impressions
-            FROM impressions GROUP BY DATE(shown_timestamp)
-            ORDER BY day
+        # Both series on one day axis; each side aggregates off its timestamp index
+        daily = load_table(
+            "daily_activity",
             """
-        )
-        daily_red = load_table(
-            "daily_red",
-            """
-            SELECT DATE(redeemed_timestamp) AS day, COUNT(*) AS redemptions
-            FROM redemptions GROUP BY DATE(redeemed_timestamp)
+            SELECT day, SUM(impressions) AS impressions, SUM(redemptions) AS redemptions
+            FROM (
+                SELECT DATE(shown_timestamp) AS day, COUNT(*) AS impressions, 0 AS redemptions
+                FROM impressions GROUP BY DATE(shown_timestamp)
+                UNION ALL
+                SELECT DATE(redeemed_timestamp), 0, COUNT(*)
+                FROM redemptions GROUP BY DATE(redeemed_timestamp)
+            )
+            GROUP BY day
             ORDER BY day
             """
         )
         fig = make_subplots(specs=[[{"secondary_y": True}]])
         fig.add_trace(
-            go.Scatter(x=daily_imp["day"], y=daily_imp["impressions"],
+            go.Scatter(x=daily["day"], y=daily["impressions"],
                        name="Impressions", line=dict(color="#45B7D1")),
             secondary_y=False,
         )
         fig.add_trace(
-            go.Scatter(x=daily_red["day"], y=daily_red["redemptions"],
+            go.Scatter(x=daily["day"], y=daily["redemptions"],
                        name="Redemptions", line=dict(color="#FF6B6B")),
             secondary_y=True,
         )
@@ -393,8 +428,7 @@ with tab3:
 
     artifact_path = MODELS_DIR / "ranker_latest.pkl"
     if artifact_path.exists():
-        import joblib
-        artifact = joblib.load(artifact_path)
+        artifact = load_artifact(str(artifact_path), artifact_path.stat().st_mtime)
         metrics = artifact.get("metrics", {})
 
         col1, col2, col3, col4 = st.columns(4)
@@ -15,43 +15,89 @@ from src.config import DB_PATH, SCHEMA_PATH, DATA_DIR
 logger = logging.getLogger(__name__)
 
 
-def get_connection(db_path=None):
+def get_connection(db_path=None, read_only=False):
     """
     Get a SQLite connection with optimal settings.
 
     Returns a connection with WAL mode, foreign keys enabled,
-    and Row factory for dict-like access.
+    and Row factory for dict-like access. Temp tables/sorts stay in
+    memory and reads go through a 256MB mmap window. With read_only=True
+    the connection also refuses writes (PRAGMA query_only).
     """
     path = db_path or DB_PATH
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(str(path))
+    # Larger statement cache: the API and pipeline reuse a fixed set of queries
+    conn = sqlite3.connect(str(path), cached_statements=256)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("PRAGMA cache_size=-64000")  # 64MB cache
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+    if read_only:
+        conn.execute("PRAGMA query_only=ON")
     return conn
 
 
 @contextmanager
-def get_db_context(db_path=None):
+def get_db_context(db_path=None, read_only=False):
     """Context manager that auto-closes the connection."""
-    conn = get_connection(db_path)
+    conn = get_connection(db_path, read_only=read_only)
     try:
         yield conn
     finally:
         conn.close()
 
 
+# Bump when schema.sql gains tables/indexes existing databases must pick up
+SCHEMA_VERSION = 1
+
+
 def init_db(conn):
-    """Initialize database schema from schema.sql."""
+    """
+    Initialize database schema from schema.sql.
+
+    Every statement is IF NOT EXISTS, so this doubles as the migration step
+    for existing databases (see migrate_db). Derived tables the script
+    creates on an existing database are backfilled once, right after
+    creation. Stamps PRAGMA user_version with SCHEMA_VERSION.
+    """
+    had_fts = table_exists(conn, "customers_fts")
+    had_denorm = table_exists(conn, "recommendations_denorm")
     schema_sql = SCHEMA_PATH.read_text(encoding="utf-8")
     conn.executescript(schema_sql)
+    if not had_fts:
+        # Triggers only see new writes; index customers that predate the table
+        conn.execute("INSERT INTO customers_fts(customers_fts) VALUES ('rebuild')")
+    if not had_denorm:
+        # Deferred: score_ranker pulls in pandas/features, db stays import-light
+        from src.score_ranker import backfill_recommendations_denorm
+        backfill_recommendations_denorm(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     logger.info("Database schema initialized")
 
 
+def migrate_db(conn):
+    """
+    Bring an existing database up to SCHEMA_VERSION.
+
+    A no-op once the database is current, so it is cheap to call at the
+    start of every pipeline run. Otherwise re-applies schema.sql and runs
+    ANALYZE once so the planner has statistics for the new indexes.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return False
+    logger.info(f"Migrating database schema v{version} -> v{SCHEMA_VERSION}")
+    init_db(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+    return True
+
+
 def table_exists(conn, table_name):
     """Check if a table exists in the database."""
     cursor = conn.execute(
@@ -324,6 +324,15 @@ def build_offer_features(conn, reference_date):
 # Interaction features (computed on-demand for pairs)
 # ---------------------------------------------------------------------------
 
+# Column order of the rows build_interaction_features accumulates
+INTERACTION_COLUMNS = (
+    "customer_id", "offer_id", "bought_product_before",
+    "days_since_last_cat_purchase", "category_affinity_score",
+    "discount_depth_vs_usual", "price_sensitivity_match",
+    "business_type_match", "subtype_category_affinity",
+)
+
+
 def build_interaction_features(conn, pairs_df, reference_date):
     """
     Compute interaction features for given (customer_id, offer_id) pairs.
@@ -336,12 +345,7 @@ def build_interaction_features(conn, pairs_df, reference_date):
             business_type_match
     """
     if pairs_df.empty:
-        return pd.DataFrame(columns=[
-            "customer_id", "offer_id", "bought_product_before",
-            "days_since_last_cat_purchase", "category_affinity_score",
-            "discount_depth_vs_usual", "price_sensitivity_match",
-            "business_type_match", "subtype_category_affinity",
-        ])
+        return pd.DataFrame(columns=list(INTERACTION_COLUMNS))
 
     logger.info(f"Computing interaction features for {len(pairs_df):,} pairs...")
 
@@ -431,13 +435,7 @@ def build_interaction_features(conn, pairs_df, reference_date):
         oid = pair["offer_id"]
 
         if oid not in offer_map.index:
-            results.append({
-                "customer_id": cid, "offer_id": oid,
-                "bought_product_before": 0, "days_since_last_cat_purchase": 999,
-                "category_affinity_score": 0.0, "discount_depth_vs_usual": 0.0,
-                "price_sensitivity_match": 0.0, "business_type_match": 0.0,
-                "subtype_category_affinity": 0.5,
-            })
+            results.append((cid, oid, 0, 999, 0.0, 0.0, 0.0, 0.0, 0.5))
             continue
 
         o_info = offer_map.loc[oid]
@@ -509,18 +507,18 @@ def build_interaction_features(conn, pairs_df, reference_date):
         raw_aff_ = sub_aff_map_.get(cat, 1.0)  # 1.0 = neutral if category not in map
         subtype_cat_affinity = round(raw_aff_ / max(max_aff_, 0.001), 4)
 
-        results.append({
-            "customer_id": cid,
-            "offer_id": oid,
-            "bought_product_before": bought_before,
-            "days_since_last_cat_purchase": days_since,
-            "category_affinity_score": round(affinity, 4),
-            "discount_depth_vs_usual": round(depth_vs_usual, 4),
-            "price_sensitivity_match": round(psm, 4),
-            "business_type_match": bt_match,
-            "subtype_category_affinity": subtype_cat_affinity,
-        })
-
-    df = pd.DataFrame(results)
+        results.append((
+            cid,
+            oid,
+            bought_before,
+            days_since,
+            round(affinity, 4),
+            round(depth_vs_usual, 4),
+            round(psm, 4),
+            bt_match,
+            subtype_cat_affinity,
+        ))
+
+    df = pd.DataFrame.from_records(results, columns=list(INTERACTION_COLUMNS))
     logger.info(f"  Interaction features computed: {len(df):,} rows")
     return df
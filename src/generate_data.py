@@ -31,15 +31,16 @@ from tqdm import tqdm
 from src.config import (
     SEED, N_CUSTOMERS, N_PRODUCTS, N_OFFERS, N_STORES, HISTORY_DAYS,
     TARGET_ORDER_ITEMS, TARGET_IMPRESSIONS, TARGET_REDEMPTION_RATE,
-    BUSINESS_TYPE_DIST, BUSINESS_SUBTYPE_DIST, LOYALTY_TIERS,
-    CATEGORIES, CATEGORY_NAMES, CATEGORY_WEIGHTS, SUBCATEGORIES,
+    BUSINESS_TYPE_DIST, BUSINESS_TYPE_CUM, BUSINESS_SUBTYPE_CUM, LOYALTY_TIER_CUM,
+    CATEGORIES, CATEGORY_NAMES, CATEGORY_NAMES_ARR, CATEGORY_WEIGHTS,
+    CATEGORY_WEIGHTS_ARR, SUBCATEGORIES_ARR,
     CATEGORY_PRICE_RANGE, CATEGORY_MARGIN_RANGE, CATEGORY_SHELF_LIFE,
-    FRESH_CATEGORIES, BUSINESS_PROFILES, BUSINESS_CATEGORY_AFFINITY,
-    METRO_OWN_BRANDS, OWN_BRAND_PROBABILITY, ROMANIAN_BRANDS,
-    BRANDS_PER_CATEGORY, SEASONAL_EVENTS, WEEKLY_PATTERNS,
+    FRESH_CATEGORIES, BUSINESS_PROFILES, SUBTYPE_INDEX, CATEGORY_AFFINITY_MATRIX,
+    METRO_OWN_BRANDS, OWN_BRANDS_BY_CATEGORY, OWN_BRAND_PROBABILITY, ROMANIAN_BRANDS_ARR,
+    BRANDS_PER_CATEGORY, SEASONAL_MULTIPLIER_BY_DOY, WEEKLY_PATTERNS,
     TIER_DISCOUNT_RANGES, TIER_QUANTITY_THRESHOLDS,
-    OFFER_TYPE_DIST, CAMPAIGN_TYPE_DIST, CHANNEL_DIST,
-    PURCHASE_MODE_DIST, INDIVIDUAL_PURCHASE_PROFILE,
+    OFFER_TYPE_CUM, CAMPAIGN_TYPE_CUM, CHANNEL_CUM,
+    PURCHASE_MODE_CUM, INDIVIDUAL_PURCHASE_PROFILE,
     DB_PATH, DATA_DIR, MODELS_DIR, LOGS_DIR,
 )
 from src.db import get_connection, init_db
@@ -71,6 +72,20 @@ _BUSINESS_NAME_TEMPLATES = {
 }
 
 
+# Fallback for categories without a SUBCATEGORIES entry
+_GENERAL_SUBCATEGORY = np.array(["general"], dtype=object)
+
+
+def sample_categorical(dist_cum, rng, size=None):
+    """Draw from a (labels, cumulative weights) pair built in src.config.
+
+    Same draws as rng.choice(labels, size, p=weights), without re-validating
+    and re-accumulating the weights on every call.
+    """
+    labels, cum = dist_cum
+    return labels[cum.searchsorted(rng.random(size), side="right")]
+
+
 class MetroDataGenerator:
     """Generates realistic synthetic data for the Metro Romania recommendation pipeline."""
 
@@ -147,25 +162,22 @@ class MetroDataGenerator:
     # Customers
     # ------------------------------------------------------------------
 
-    def _generate_customers(self, conn):
-        btype_names = list(BUSINESS_TYPE_DIST.keys())
-        btype_probs = list(BUSINESS_TYPE_DIST.values())
-
-        btype_arr = self.rng.choice(btype_names, size=self.n_customers, p=btype_probs)
+    def _sample_by_type(self, btype_arr, cum_by_type):
+        """One categorical draw per customer from its business type's distribution."""
+        u = self.rng.random(len(btype_arr))
+        out = np.empty(len(btype_arr), dtype=object)
+        for bt, (labels, cum) in cum_by_type.items():
+            mask = btype_arr == bt
+            out[mask] = labels[cum.searchsorted(u[mask], side="right")]
+        return out
 
-        # Business subtypes
-        subtype_arr = []
-        for bt in btype_arr:
-            subs = list(BUSINESS_SUBTYPE_DIST[bt].keys())
-            sub_probs = list(BUSINESS_SUBTYPE_DIST[bt].values())
-            subtype_arr.append(self.rng.choice(subs, p=sub_probs))
+    def _generate_customers(self, conn):
+        btype_arr = sample_categorical(BUSINESS_TYPE_CUM, self.rng, size=self.n_customers)
 
-        # Loyalty tiers
-        loyalty = []
-        for bt in btype_arr:
-            tiers = list(LOYALTY_TIERS[bt].keys())
-            probs = list(LOYALTY_TIERS[bt].values())
-            loyalty.append(self.rng.choice(tiers, p=probs))
+        # Business subtypes and loyalty tiers: one uniform per customer each,
+        # mapped through the CDF of that customer's business type
+        subtype_arr = self._sample_by_type(btype_arr, BUSINESS_SUBTYPE_CUM)
+        loyalty = self._sample_by_type(btype_arr, LOYALTY_TIER_CUM)
 
         # Home store
         store_ids = self.rng.integers(1, self.n_stores + 1, size=self.n_customers)
@@ -233,25 +245,14 @@ class MetroDataGenerator:
     # ------------------------------------------------------------------
 
     def _generate_products(self, conn):
-        cat_weights = np.array(CATEGORY_WEIGHTS, dtype=float)
-        cat_weights /= cat_weights.sum()
-
         categories = self.rng.choice(
-            CATEGORY_NAMES, size=self.n_products, p=cat_weights
+            CATEGORY_NAMES_ARR, size=self.n_products, p=CATEGORY_WEIGHTS_ARR
         )
 
-        # Build own-brand candidate mapping (category -> list of brand_names)
-        own_brand_by_cat = {}
-        for brand_name, info in METRO_OWN_BRANDS.items():
-            for cat in info["categories"]:
-                if cat not in own_brand_by_cat:
-                    own_brand_by_cat[cat] = []
-                own_brand_by_cat[cat].append(brand_name)
-
         rows = []
         for pid in range(1, self.n_products + 1):
             cat = categories[pid - 1]
-            subcats = SUBCATEGORIES.get(cat, ["general"])
+            subcats = SUBCATEGORIES_ARR.get(cat, _GENERAL_SUBCATEGORY)
             subcat = self.rng.choice(subcats)
 
             # Determine if own brand
@@ -259,14 +260,14 @@ class MetroDataGenerator:
             own_brand_name = None
             brand = None
 
-            if cat in own_brand_by_cat and self.rng.random() < OWN_BRAND_PROBABILITY:
+            if cat in OWN_BRANDS_BY_CATEGORY and self.rng.random() < OWN_BRAND_PROBABILITY:
                 is_own_brand = True
-                own_brand_name = self.rng.choice(own_brand_by_cat[cat])
+                own_brand_name = self.rng.choice(OWN_BRANDS_BY_CATEGORY[cat])
                 brand = own_brand_name.replace("_", " ").title()
             else:
                 # Use Romanian brands if available, else generic
-                rom_brands = ROMANIAN_BRANDS.get(cat, [])
-                if rom_brands and self.rng.random() < 0.4:
+                rom_brands = ROMANIAN_BRANDS_ARR.get(cat)
+                if rom_brands is not None and self.rng.random() < 0.4:
                     brand = self.rng.choice(rom_brands)
                 else:
                     brand_num = self.rng.integers(1, BRANDS_PER_CATEGORY + 1)
@@ -383,6 +384,7 @@ class MetroDataGenerator:
         item_rows = []
 
         n_cats = len(CATEGORY_NAMES)
+        cat_weights_raw = np.array(CATEGORY_WEIGHTS, dtype=float)
 
         for batch_start in tqdm(
             range(0, self.n_customers, 5000),
@@ -406,10 +408,7 @@ class MetroDataGenerator:
                 freq = max(0.1, freq)
 
                 # Customer-specific category affinity
-                cat_affinity = np.array(CATEGORY_WEIGHTS, dtype=float)
-                sub_aff = BUSINESS_CATEGORY_AFFINITY.get(sub, {})
-                for i, cat_name in enumerate(CATEGORY_NAMES):
-                    cat_affinity[i] *= sub_aff.get(cat_name, 1.0)
+                cat_affinity = cat_weights_raw * CATEGORY_AFFINITY_MATRIX[SUBTYPE_INDEX[sub]]
                 cat_affinity *= (1 + self.rng.normal(0, 0.2, size=n_cats))
                 cat_affinity = np.maximum(cat_affinity, 0.001)
                 cat_affinity /= cat_affinity.sum()
@@ -426,6 +425,7 @@ class MetroDataGenerator:
 
                 order_days = self.rng.integers(0, self.history_days, size=n_orders)
                 order_days.sort()
+                weekly_pattern = WEEKLY_PATTERNS.get(bt, {})
 
                 for day_offset in order_days:
                     order_date = self.start_date + timedelta(days=int(day_offset))
@@ -433,7 +433,7 @@ class MetroDataGenerator:
                     doy = order_date.timetuple().tm_yday
 
                     # Weekly pattern by business type
-                    weekly_mult = WEEKLY_PATTERNS.get(bt, {}).get(dow, 1.0)
+                    weekly_mult = weekly_pattern.get(dow, 1.0)
 
                     # Seasonal
                     seasonal_mult = self._get_seasonal_multiplier(doy)
@@ -445,10 +445,7 @@ class MetroDataGenerator:
                     order_id += 1
 
                     # Determine purchase mode: business (~87%) or individual (~13%)
-                    purchase_mode = self.rng.choice(
-                        list(PURCHASE_MODE_DIST.keys()),
-                        p=list(PURCHASE_MODE_DIST.values()),
-                    )
+                    purchase_mode = sample_categorical(PURCHASE_MODE_CUM, self.rng)
                     is_individual = purchase_mode == "individual"
 
                     # Basket size (varies by subtype; much smaller for individual)
@@ -461,7 +458,7 @@ class MetroDataGenerator:
 
                     # Select products
                     chosen_cats = self.rng.choice(
-                        CATEGORY_NAMES, size=n_items, p=cat_affinity
+                        CATEGORY_NAMES_ARR, size=n_items, p=cat_affinity
                     )
 
                     order_total = 0.0
@@ -634,11 +631,7 @@ class MetroDataGenerator:
         conn.commit()
 
     def _get_seasonal_multiplier(self, day_of_year):
-        mult = 1.0
-        for event in SEASONAL_EVENTS.values():
-            if event["start_day"] <= day_of_year <= event["end_day"]:
-                mult = max(mult, event["multiplier"])
-        return mult
+        return SEASONAL_MULTIPLIER_BY_DOY[day_of_year]
 
     # ------------------------------------------------------------------
     # Offers
@@ -690,12 +683,6 @@ class MetroDataGenerator:
         chosen_products = chosen_products_list[: self.n_offers]
 
         btypes = list(BUSINESS_TYPE_DIST.keys())
-        offer_types = list(OFFER_TYPE_DIST.keys())
-        offer_type_probs = list(OFFER_TYPE_DIST.values())
-        campaign_types = list(CAMPAIGN_TYPE_DIST.keys())
-        campaign_probs = list(CAMPAIGN_TYPE_DIST.values())
-        channels = list(CHANNEL_DIST.keys())
-        channel_probs = list(CHANNEL_DIST.values())
 
         # Build a price lookup so fixed_amount discounts never exceed the product price
         price_lookup = products.set_index("product_id")["tier1_price"].to_dict()
@@ -706,7 +693,7 @@ class MetroDataGenerator:
             pid = int(chosen_products[i])
 
             # Offer type
-            otype = self.rng.choice(offer_types, p=offer_type_probs)
+            otype = sample_categorical(OFFER_TYPE_CUM, self.rng)
 
             # Discount value based on type
             buy_qty = None
@@ -736,8 +723,8 @@ class MetroDataGenerator:
                 dvalue = 0.0
 
             # Campaign type
-            ctype = self.rng.choice(campaign_types, p=campaign_probs)
-            channel = self.rng.choice(channels, p=channel_probs)
+            ctype = sample_categorical(CAMPAIGN_TYPE_CUM, self.rng)
+            channel = sample_categorical(CHANNEL_CUM, self.rng)
 
             # Stagger start dates — allow offers to be active up to end_date
             offer_duration = int(self.rng.integers(7, 29))
@@ -832,9 +819,6 @@ class MetroDataGenerator:
         cust_products = self._compute_customer_products(conn)
         cust_orders = self._compute_customer_orders(conn)
 
-        channels = list(CHANNEL_DIST.keys())
-        channel_weights = list(CHANNEL_DIST.values())
-
         impression_rows = []
         redemption_rows = []
         impression_id = 0
@@ -913,7 +897,7 @@ class MetroDataGenerator:
                     info = offer_product[chosen_oid]
 
                     impression_id += 1
-                    channel = self.rng.choice(channels, p=channel_weights)
+                    channel = sample_categorical(CHANNEL_CUM, self.rng)
                     ctype = info.get("campaign_type")
 
                     impression_rows.append((
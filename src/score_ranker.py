@@ -87,7 +87,7 @@ def score_candidates(model, run_date, conn):
         for col in missing_feature_cols:
             scored[col] = 0.0
 
-    X = scored[FEATURE_COLUMNS].values.astype(np.float32)
+    X = scored[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
     scores = model.predict_proba(X)[:, 1]
     scored["score"] = scores
 
@@ -108,9 +108,82 @@ def score_candidates(model, run_date, conn):
     recs_df.to_sql("recommendations", conn, if_exists="append", index=False)
     conn.commit()
 
+    materialize_recommendations(conn, run_date)
+
     n_customers = recs_df["customer_id"].nunique()
     logger.info(
         f"  Recommendations written: {len(recs_df):,} "
         f"(top-{TOP_N_RECOMMENDATIONS} for {n_customers:,} customers)"
     )
     return len(recs_df)
+
+
+def materialize_recommendations(conn, run_date):
+    """
+    Rebuild recommendations_denorm for run_date.
+
+    Copies each recommendation together with its offer and product columns
+    so the API serves a customer's top-N from one table instead of a
+    recommendations -> offers -> products JOIN per request.
+    """
+    conn.execute("DELETE FROM recommendations_denorm WHERE run_date = ?", (run_date,))
+
+    # Join offer -> product once per distinct recommended offer, then expand
+    # per customer with a single rowid probe instead of two JOIN descents
+    conn.execute("DROP TABLE IF EXISTS temp.run_offer_details")
+    conn.execute("""
+        CREATE TEMP TABLE run_offer_details (
+            offer_id INTEGER PRIMARY KEY,
+            product_id INTEGER,
+            product_name TEXT,
+            subcategory TEXT,
+            category TEXT,
+            brand TEXT,
+            offer_type TEXT,
+            discount_value REAL,
+            expiry_date DATE,
+            tier1_price REAL,
+            campaign_type TEXT
+        )
+    """)
+    conn.execute("""
+        INSERT INTO run_offer_details
+        SELECT
+            o.offer_id, o.product_id, p.name, p.subcategory, p.category, p.brand,
+            o.offer_type, o.discount_value, o.end_date, p.tier1_price, o.campaign_type
+        FROM offers o
+        JOIN products p ON o.product_id = p.product_id
+        WHERE o.offer_id IN (
+            SELECT DISTINCT offer_id FROM recommendations WHERE run_date = ?
+        )
+    """, (run_date,))
+    conn.execute("""
+        INSERT INTO recommendations_denorm (
+            customer_id, run_date, rank, offer_id, product_id, product_name,
+            subcategory, category, brand, offer_type, discount_value,
+            expiry_date, tier1_price, campaign_type, score
+        )
+        SELECT
+            r.customer_id, r.run_date, r.rank, r.offer_id, d.product_id, d.product_name,
+            d.subcategory, d.category, d.brand, d.offer_type, d.discount_value,
+            d.expiry_date, d.tier1_price, d.campaign_type, r.score
+        FROM recommendations r
+        JOIN run_offer_details d ON d.offer_id = r.offer_id
+        WHERE r.run_date = ?
+    """, (run_date,))
+    conn.execute("DROP TABLE temp.run_offer_details")
+    conn.commit()
+
+
+def backfill_recommendations_denorm(conn):
+    """Materialize recommendations_denorm for every run_date already scored."""
+    run_dates = [
+        row[0] for row in conn.execute(
+            "SELECT DISTINCT run_date FROM recommendations ORDER BY run_date"
+        )
+    ]
+    for run_date in run_dates:
+        materialize_recommendations(conn, run_date)
+    if run_dates:
+        logger.info(f"  Backfilled recommendations_denorm for {len(run_dates)} run dates")
+    return len(run_dates)
@@ -22,12 +22,13 @@ from typing import Optional
 import numpy as np
 
 from src.config import (
-    SEED, BUSINESS_TYPE_DIST, BUSINESS_SUBTYPE_DIST, BUSINESS_PROFILES,
-    BUSINESS_CATEGORY_AFFINITY, WEEKLY_PATTERNS, SEASONAL_EVENTS,
-    CATEGORY_NAMES, CATEGORY_WEIGHTS, PURCHASE_MODE_DIST,
+    SEED, BUSINESS_TYPE_DIST, BUSINESS_SUBTYPE_DIST, BUSINESS_PROFILES, BUSINESS_PROFILE_ARR,
+    CATEGORY_AFFINITY_MATRIX, SUBTYPE_INDEX, WEEKLY_PATTERN_MATRIX, SEASONAL_EVENTS,
+    BUSINESS_TYPE_ENCODING,
+    CATEGORY_NAMES_ARR, CATEGORY_WEIGHTS_ARR, PURCHASE_MODE_CUM,
     INDIVIDUAL_PURCHASE_PROFILE, CHANNEL_DIST, TARGET_REDEMPTION_RATE,
 )
-from src.generate_data import MetroDataGenerator
+from src.generate_data import MetroDataGenerator, sample_categorical
 
 logger = logging.getLogger(__name__)
 
@@ -72,7 +73,9 @@ def simulate_day(conn, run_date: str) -> dict:
     n_customers = len(rows)
     customer_ids   = np.array([r[0] for r in rows], dtype=np.int64)
     business_types = [r[1] for r in rows]
+    btype_codes    = np.fromiter((BUSINESS_TYPE_ENCODING[bt] for bt in business_types), dtype=np.intp, count=n_customers)
     subtypes       = [r[2] for r in rows]
+    subtype_ids    = np.fromiter((SUBTYPE_INDEX[sub] for sub in subtypes), dtype=np.intp, count=n_customers)
     store_ids      = np.array([r[3] for r in rows], dtype=np.int32)
     email_consent  = np.array([r[4] for r in rows], dtype=bool)
     sms_consent    = np.array([r[5] for r in rows], dtype=bool)
@@ -83,14 +86,8 @@ def simulate_day(conn, run_date: str) -> dict:
     # ------------------------------------------------------------------ #
     rng = generator.rng
 
-    freq_arr = np.array(
-        [BUSINESS_PROFILES[sub].get("purchase_freq_weekly", 1.0) for sub in subtypes],
-        dtype=float,
-    )
-    weekly_mult_arr = np.array(
-        [WEEKLY_PATTERNS.get(bt, {}).get(dow, 1.0) for bt in business_types],
-        dtype=float,
-    )
+    freq_arr = BUSINESS_PROFILE_ARR["purchase_freq_weekly"][subtype_ids]
+    weekly_mult_arr = WEEKLY_PATTERN_MATRIX[btype_codes, dow]
 
     p_order = np.minimum(1.0, freq_arr / 7.0 * weekly_mult_arr * seasonal_mult * 0.6)
     p_order *= rng.uniform(0.85, 1.15, size=n_customers)
@@ -131,9 +128,6 @@ def simulate_day(conn, run_date: str) -> dict:
             "tier3_min_qty": pr[6],
         }
 
-    cat_weights_arr = np.array(CATEGORY_WEIGHTS, dtype=float)
-    cat_weights_arr /= cat_weights_arr.sum()
-
     # ------------------------------------------------------------------ #
     # 5.  Generate orders + items
     # ------------------------------------------------------------------ #
@@ -151,10 +145,7 @@ def simulate_day(conn, run_date: str) -> dict:
         sid  = int(store_ids[idx])
         profile = BUSINESS_PROFILES[sub]
 
-        purchase_mode = rng.choice(
-            list(PURCHASE_MODE_DIST.keys()),
-            p=list(PURCHASE_MODE_DIST.values()),
-        )
+        purchase_mode = sample_categorical(PURCHASE_MODE_CUM, rng)
         is_individual = purchase_mode == "individual"
 
         basket_mean = profile["basket_size_mean"]
@@ -165,14 +156,11 @@ def simulate_day(conn, run_date: str) -> dict:
         n_items = max(1, int(rng.normal(basket_mean, basket_std)))
 
         # Category affinity for this customer
-        sub_aff = BUSINESS_CATEGORY_AFFINITY.get(sub, {})
-        cat_aff = cat_weights_arr.copy()
-        for i, cname in enumerate(CATEGORY_NAMES):
-            cat_aff[i] *= sub_aff.get(cname, 1.0)
+        cat_aff = CATEGORY_WEIGHTS_ARR * CATEGORY_AFFINITY_MATRIX[subtype_ids[idx]]
         cat_aff = np.maximum(cat_aff, 0.001)
         cat_aff /= cat_aff.sum()
 
-        chosen_cats = rng.choice(CATEGORY_NAMES, size=n_items, p=cat_aff)
+        chosen_cats = rng.choice(CATEGORY_NAMES_ARR, size=n_items, p=cat_aff)
 
         order_id += 1
         order_total           = 0.0
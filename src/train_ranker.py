@@ -131,7 +131,7 @@ def build_training_set(conn, reference_date):
             merged[col] = 0.0
 
     # Extract features and labels
-    X = merged[FEATURE_COLUMNS].values.astype(np.float32)
+    X = merged[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
     y = merged["label"].values.astype(np.int32)
 
     logger.info(f"  Feature matrix shape: {X.shape}")
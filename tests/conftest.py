@@ -7,6 +7,8 @@ that all tests can share. Runs the mini data generation once per session.
 
 import os
 import sys
+from datetime import date
+
 import pytest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,7 +19,9 @@ from src.generate_data import MetroDataGenerator
 
 
 TEST_DB_PATH = DATA_DIR / "test_metro.db"
-TEST_RUN_DATE = "2026-02-01"
+# MetroDataGenerator ends its history (and offer windows) at date.today(),
+# so a fixed calendar date drifts out of the generated data over time
+TEST_RUN_DATE = date.today().isoformat()
 
 
 @pytest.fixture(scope="session")
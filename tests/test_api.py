@@ -6,22 +6,23 @@ import pytest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import aiosqlite
 from fastapi.testclient import TestClient
 
+import src.api as api
 from src.api import app, get_db
 from src.config import DATA_DIR
-from src.db import get_connection
 
 TEST_DB_PATH = DATA_DIR / "test_metro.db"
 
 
-def override_get_db():
+async def override_get_db():
     """Override DB dependency to use test database."""
-    conn = get_connection(TEST_DB_PATH)
+    conn = await aiosqlite.connect(str(TEST_DB_PATH))
     try:
         yield conn
     finally:
-        conn.close()
+        await conn.close()
 
 
 app.dependency_overrides[get_db] = override_get_db
@@ -95,9 +96,41 @@ class TestCustomerEndpoint:
         assert response.status_code == 404
 
 
+@pytest.mark.usefixtures("test_db")
 class TestBatchEndpoint:
-    def test_empty_ids_returns_400(self):
-        if not TEST_DB_PATH.exists():
-            pytest.skip("Test DB not generated yet")
+    def test_empty_ids_returns_422(self):
         response = client.get("/recommendations/batch?customer_ids=")
-        assert response.status_code == 400
+        assert response.status_code == 422
+
+    def test_over_100_ids_returns_422(self):
+        ids = "&".join(f"customer_ids={i}" for i in range(1, 102))
+        response = client.get(f"/recommendations/batch?{ids}")
+        assert response.status_code == 422
+
+
+@pytest.mark.usefixtures("test_db")
+class TestHttpCaching:
+    def test_matching_etag_returns_304(self):
+        response = client.get("/products/1")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert "max-age" in response.headers["cache-control"]
+
+        cached = client.get("/products/1", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+    def test_write_invalidates_etag(self, test_db, monkeypatch):
+        monkeypatch.setattr(api, "DB_PATH", TEST_DB_PATH)
+        etag = client.get("/products/1").headers["etag"]
+
+        name = test_db.execute("SELECT name FROM products WHERE product_id = 1").fetchone()[0]
+        test_db.execute("UPDATE products SET name = ? WHERE product_id = 1", (name + " (new)",))
+        test_db.commit()
+        try:
+            response = client.get("/products/1", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.json()["name"] == name + " (new)"
+        finally:
+            test_db.execute("UPDATE products SET name = ? WHERE product_id = 1", (name,))
+            test_db.commit()
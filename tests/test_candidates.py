@@ -4,8 +4,13 @@ import pytest
 import pandas as pd
 
 from src.features import build_customer_features, build_offer_features
-from src.candidates import generate_candidate_pool
-from src.config import CANDIDATE_POOL_SIZE
+from src.candidates import generate_candidate_pool, _eligibility_matrix, _scope_sets
+from src.config import CANDIDATE_POOL_SIZE, CANDIDATE_STRATEGY_LIMITS
+
+
+def _scope_allows(scope, value):
+    """Reference scope rule: empty/NULL scope allows everyone."""
+    return not scope or value in scope.split(",")
 
 
 class TestCandidateGeneration:
@@ -70,3 +75,95 @@ class TestCandidateGeneration:
         ).fetchone()[0]
 
         assert count1 == count2, "Candidate generation should be idempotent"
+
+
+class TestEligibilityMatrix:
+    def test_matches_per_pair_scope_rules(self):
+        scopes = pd.DataFrame({
+            "business_type_scope": [None, "horeca", "horeca,trader", ""],
+            "business_subtype_scope": [None, None, "restaurant", None],
+            "loyalty_tier_scope": ["gold", None, None, None],
+            "store_scope": [None, None, None, "1,3"],
+        })
+        customers = [
+            ("horeca", "restaurant", "gold", "1"),
+            ("trader", "grocery_store", "standard", "2"),
+            ("horeca", "cafe_bar", "standard", "3"),
+        ]
+        eligible = _eligibility_matrix(
+            [[c[i] for c in customers] for i in range(4)],
+            [_scope_sets(scopes[col]) for col in scopes.columns],
+        )
+
+        expected = [
+            [all(_scope_allows(row[col], c[i]) for i, col in enumerate(scopes.columns))
+             for row in scopes.to_dict("records")]
+            for c in customers
+        ]
+        assert eligible.tolist() == expected
+
+    def test_matches_fixture_offers(self, conn, run_date):
+        offers = pd.read_sql("""
+            SELECT business_type_scope, business_subtype_scope,
+                   loyalty_tier_scope, store_scope
+            FROM offers WHERE start_date <= :rd AND end_date >= :rd
+        """, conn, params={"rd": run_date})
+        customers = pd.read_sql("""
+            SELECT business_type, business_subtype, loyalty_tier,
+                   CAST(home_store_id AS TEXT) AS home_store_id
+            FROM customers
+        """, conn)
+        assert not offers.empty, "Fixture should have offers active on run_date"
+
+        eligible = _eligibility_matrix(
+            [customers[col].tolist() for col in customers.columns],
+            [_scope_sets(offers[col]) for col in offers.columns],
+        )
+
+        expected = [
+            [all(_scope_allows(row[col], c[i]) for i, col in enumerate(offers.columns))
+             for row in offers.to_dict("records")]
+            for c in customers.itertuples(index=False)
+        ]
+        assert eligible.tolist() == expected
+
+
+class TestCandidatePoolRules:
+    @pytest.fixture(autouse=True)
+    def setup(self, conn, run_date):
+        build_customer_features(conn, run_date)
+        build_offer_features(conn, run_date)
+        generate_candidate_pool(conn, run_date)
+
+    def test_candidates_respect_offer_scope(self, conn, run_date):
+        pool = pd.read_sql("""
+            SELECT c.business_type, c.business_subtype, c.loyalty_tier,
+                   CAST(c.home_store_id AS TEXT) AS home_store_id,
+                   o.business_type_scope, o.business_subtype_scope,
+                   o.loyalty_tier_scope, o.store_scope
+            FROM candidate_pool cp
+            JOIN customers c ON cp.customer_id = c.customer_id
+            JOIN offers o ON cp.offer_id = o.offer_id
+            WHERE cp.run_date = ?
+        """, conn, params=(run_date,))
+        assert not pool.empty
+
+        dims = [("business_type", "business_type_scope"),
+                ("business_subtype", "business_subtype_scope"),
+                ("loyalty_tier", "loyalty_tier_scope"),
+                ("home_store_id", "store_scope")]
+        for row in pool.to_dict("records"):
+            for value, scope in dims:
+                assert _scope_allows(row[scope], row[value]), (value, row)
+
+    def test_strategy_caps(self, conn, run_date):
+        counts = pd.read_sql("""
+            SELECT customer_id, strategy, COUNT(*) AS n
+            FROM candidate_pool WHERE run_date = ?
+            GROUP BY customer_id, strategy
+        """, conn, params=(run_date,))
+        assert not counts.empty
+
+        limits = counts["strategy"].map(CANDIDATE_STRATEGY_LIMITS)
+        assert limits.notna().all(), "Every strategy should have a configured limit"
+        assert (counts["n"] <= limits).all()